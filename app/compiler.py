@@ -1,5 +1,10 @@
 import sys
 import os
+import time
+import hashlib
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 
 from PyQt6.QtWidgets import (
     QApplication,
@@ -20,12 +25,19 @@ from PyQt6.QtWidgets import (
     QTreeWidgetItem,
     QTextBrowser,
     QPlainTextEdit,
-    QTableWidget,
-    QTableWidgetItem,
     QHeaderView,
     QDialog,
     QStyle,
-    QLabel
+    QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QTableView,
+    QComboBox,
+    QAbstractItemView,
+    QFormLayout,
+    QSpinBox,
+    QDialogButtonBox
 )
 
 from PyQt6.QtGui import (
@@ -37,11 +49,81 @@ from PyQt6.QtGui import (
     QColor,
     QPainter,
     QTextFormat,
-    QSyntaxHighlighter  
+    QSyntaxHighlighter,
+    QTextCursor
 )
 
-from PyQt6.QtCore import Qt, QSize, QRect, QRegularExpression, QTimer
+from PyQt6.QtCore import (
+    Qt,
+    QSize,
+    QRect,
+    QRegularExpression,
+    QTimer,
+    QStandardPaths,
+    QAbstractTableModel,
+    QModelIndex,
+    pyqtSignal
+)
 from translations import Translator
+from lexer import analyze, tokenize, find_definitions, TokenStore, KEYWORDS, KIND_NAMES, PARTIAL_MESSAGE
+from watcher import DirectoryWatcher, WATCH_EXTENSIONS
+from session import Session, read_session, write_session
+from grammar import GrammarError, ParseTimeout, load_grammar, parse, token_symbols
+from symbol_index import SymbolIndex
+from snapshot import PieceTable, plain_text
+
+
+# Режим длинных строк: файл со строками длиннее порога показывается только для чтения,
+# длинные строки обрезаны. Раскладка QTextLayout для блока в мегабайты останавливает Qt
+# при любом переносе, поэтому в документ такие строки целиком не попадают; сохранение,
+# анализ и навигация работают с полным текстом. Строки длиннее порога, вставленные
+# при обычной правке, подсвечиваются частично и без выделения текущей строки.
+LONG_LINE_LIMIT = 10_000
+LONG_LINE_HIGHLIGHT = 10_000  # сколько символов длинной строки подсвечивать
+LONG_LINE_MARK = " …"
+HIGHLIGHT_BLOCK_BUDGET = 0.005  # секунды на подсветку одной строки
+# Выше этого размера (в символах) невидимые блоки подсвечиваются только при прокрутке к ним
+HIGHLIGHT_BACKGROUND_LIMIT = 20_000_000
+
+
+def has_long_lines(text, limit=LONG_LINE_LIMIT):
+    # Последний перевод строки в окне из limit + 1 символов: строки до него короткие,
+    # а если перевода нет — строка от start длиннее limit
+    start = 0
+    while len(text) - start > limit:
+        end = text.rfind("\n", start, start + limit + 1)
+        if end == -1:
+            return True
+        start = end + 1
+    return False
+
+
+def truncate_long_lines(text, limit=LONG_LINE_LIMIT):
+    return "\n".join(line if len(line) <= limit else line[:limit] + LONG_LINE_MARK
+                     for line in text.split("\n"))
+
+
+# Клавиши, которые меняют текст: перед ними сбрасывается переполненная история отмены
+EDIT_KEYS = (
+    QKeySequence.StandardKey.Cut,
+    QKeySequence.StandardKey.Paste,
+    QKeySequence.StandardKey.Delete,
+    QKeySequence.StandardKey.DeleteEndOfWord,
+    QKeySequence.StandardKey.DeleteStartOfWord,
+    QKeySequence.StandardKey.DeleteEndOfLine,
+    QKeySequence.StandardKey.DeleteCompleteLine,
+)
+
+
+# Клавиши-модификаторы: приходят в keyPressEvent отдельно, текст не меняют
+MODIFIER_KEYS = (Qt.Key.Key_Shift, Qt.Key.Key_Control, Qt.Key.Key_Alt, Qt.Key.Key_Meta, Qt.Key.Key_AltGr)
+
+
+def is_edit_key(event):
+    text = event.text()
+    if text and (text.isprintable() or text in "\t\r\n\b\x7f"):
+        return True
+    return any(event.matches(key) for key in EDIT_KEYS)
 
 
 # Нумерация строк
@@ -58,7 +140,10 @@ class LineNumberArea(QWidget):
 
 
 class CodeEditor(QPlainTextEdit):
-    def __init__(self, parent=None):
+    undo_history_cleared = pyqtSignal()
+    overwrite_mode_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_undo_steps=0, max_undo_bytes=64 * 1024 * 1024):
         super().__init__(parent)
         self.line_number_area = LineNumberArea(self)
 
@@ -71,6 +156,31 @@ class CodeEditor(QPlainTextEdit):
 
         # Режим вставки/замены
         self.overwrite_mode = False
+        self.long_line_mode = False
+        self.full_text = None  # полный текст файла, пока в режиме длинных строк показан обрезанный
+        self.overwrite_run = None  # (позиция, число шагов отмены) после последнего символа в режиме замены
+
+        # Ограничение истории отмены (0 — без ограничения)
+        self.max_undo_steps = max_undo_steps
+        self.max_undo_bytes = max_undo_bytes
+        # Команды отмены и повтора: число элементов стека QTextDocument после команды и её размер
+        self.command_ends = []
+        self.command_bytes = []
+        self.undo_bytes = 0
+        self.last_undo_steps = 0
+        self.new_command = False
+        self.undo_over_limit = False
+        self.document().undoCommandAdded.connect(self.on_undo_command_added)
+        self.document().contentsChange.connect(self.account_undo_memory)
+
+        # Версия текста для снимков и таблица кусков, которая ведётся по contentsChange:
+        # снимок неизменённого документа не требует toPlainText()
+        self.text_version = 0
+        self.pieces = PieceTable()
+        self.pieces_valid = True  # False — таблица разошлась с документом, пересобирается из toPlainText()
+        self.last_snapshot = self.pieces.snapshot(0)
+        self.highlighter = None  # задаётся в SimpleSyntaxHighlighter.attach_editor
+        self.document().contentsChange.connect(self.bump_text_version)
 
     def line_number_area_width(self):
         digits = len(str(max(1, self.blockCount())))
@@ -116,7 +226,8 @@ class CodeEditor(QPlainTextEdit):
 
     def highlight_current_line(self):
         extra = []
-        if not self.isReadOnly():
+        # Выделение на всю ширину заставляет Qt заново раскладывать огромную строку
+        if not self.isReadOnly() and self.textCursor().block().length() <= LONG_LINE_LIMIT:
             selection = QTextEdit.ExtraSelection()
             selection.format.setBackground(QColor(230, 230, 255))
             selection.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
@@ -125,29 +236,249 @@ class CodeEditor(QPlainTextEdit):
             extra.append(selection)
         self.setExtraSelections(extra)
 
+    # Режим применяется к следующей загрузке текста (set_plain_text)
+    def set_long_line_mode(self, enabled):
+        self.long_line_mode = enabled
+        if not enabled and self.full_text is not None:
+            self.full_text = None
+            self.text_version += 1
+            self.pieces_valid = False
+            self.setReadOnly(False)
+
+    # Позиция в документе -> смещение в полном тексте; различаются только в режиме длинных строк
+    def text_offset(self, position):
+        if self.full_text is None:
+            return position
+        block = self.document().findBlock(position)
+        return self.snapshot().offset(block.blockNumber() + 1, position - block.position() + 1)
+
+    def document_position(self, offset):
+        if self.full_text is None:
+            return min(offset, self.document().characterCount() - 1)
+        line, col = self.snapshot().position(offset)
+        block = self.document().findBlockByNumber(line - 1)
+        return block.position() + min(col - 1, block.length() - 1)
+
     def keyPressEvent(self, event):
-        if self.overwrite_mode and not event.modifiers() and len(event.text()) > 0:
+        if is_edit_key(event):
+            self.prepare_edit()
+        # Insert переключает режим вставки/замены
+        if event.key() == Qt.Key.Key_Insert and not event.modifiers():
+            self.set_overwrite_mode(not self.overwrite_mode)
+            return
+        text = event.text()
+        # Shift (заглавные буквы, знаки) и цифровая клавиатура не отменяют замену
+        typing = not event.modifiers() & ~(Qt.KeyboardModifier.ShiftModifier | Qt.KeyboardModifier.KeypadModifier)
+        if (self.overwrite_mode and typing and len(text) > 0
+                and text.isprintable()):
             cursor = self.textCursor()
             if not cursor.hasSelection() and not cursor.atBlockEnd():
+                # Удаление и вставка — одна команда отмены; подряд набранные символы склеиваются
+                document = self.document()
+                if self.overwrite_run == (cursor.position(), document.availableUndoSteps()):
+                    cursor.joinPreviousEditBlock()
+                else:
+                    cursor.beginEditBlock()
                 cursor.deleteChar()
+                cursor.insertText(text)
+                cursor.endEditBlock()
+                self.setTextCursor(cursor)
+                self.overwrite_run = (cursor.position(), document.availableUndoSteps())
+                return
+        # Нажатие самого Shift перед заглавной буквой не разрывает серию замен
+        if event.key() not in MODIFIER_KEYS:
+            self.overwrite_run = None
         super().keyPressEvent(event)
 
+    def set_overwrite_mode(self, enabled):
+        self.overwrite_mode = enabled
+        self.overwrite_run = None
+        self.overwrite_mode_changed.emit(enabled)
+
+    def insertFromMimeData(self, source):
+        self.prepare_edit()
+        super().insertFromMimeData(source)
+
+    def inputMethodEvent(self, event):
+        if event.commitString():
+            self.prepare_edit()
+        super().inputMethodEvent(event)
+
+    def cut(self):
+        self.prepare_edit()
+        super().cut()
+
+    def clear(self):
+        super().clear()
+        # QPlainTextEdit.clear() шлёт contentsChange не по порядку правок
+        self.pieces.reset("")
+        self.pieces_valid = True
+        self.reset_undo_accounting()
+        self.overwrite_run = None
+
+    def set_undo_limits(self, max_steps, max_bytes):
+        self.max_undo_steps = max_steps
+        self.max_undo_bytes = max_bytes
+        self.undo_over_limit = self.is_undo_over_limit()
+
+    def on_undo_command_added(self):
+        self.new_command = True
+
+    # Оценка памяти истории отмены: QTextDocument хранит вставленный и удалённый текст
+    # каждой команды, пока она есть в стеке отмены или повтора
+    def account_undo_memory(self, position, removed, added):
+        steps = self.document().availableUndoSteps()
+        size = (removed + added) * 2
+        new_command, self.new_command = self.new_command, False
+        # Стеки сбрасываются явно (clear, set_plain_text, clear_undo_history): во время
+        # contentsChange отмены Qt ещё не обновил availableRedoSteps, и пустой стек не отличить
+
+        if new_command and steps != self.last_undo_steps:
+            # Новая команда отбрасывает стек повтора
+            while self.command_ends and self.command_ends[-1] > self.last_undo_steps:
+                self.command_ends.pop()
+                self.undo_bytes -= self.command_bytes.pop()
+            self.command_ends.append(steps)
+            self.command_bytes.append(size)
+            self.undo_bytes += size
+        elif steps == self.last_undo_steps and self.command_bytes:
+            # Правка склеилась с последней командой (набор подряд, joinPreviousEditBlock)
+            self.command_bytes[-1] += size
+            self.undo_bytes += size
+        # Иначе — отмена или повтор: команда переходит между стеками, память не меняется
+        self.last_undo_steps = steps
+
+        was_over, self.undo_over_limit = self.undo_over_limit, self.is_undo_over_limit()
+        if was_over and new_command and self.undo_over_limit:
+            # Правка прошла мимо prepare_edit (например, «Вырезать» из контекстного меню).
+            # Изнутри правки стек чистить нельзя — откладываем до возврата в цикл событий
+            QTimer.singleShot(0, self.clear_undo_history)
+
+    def is_undo_over_limit(self):
+        over_steps = self.max_undo_steps and self.undo_steps() > self.max_undo_steps
+        over_bytes = self.max_undo_bytes and self.undo_bytes > self.max_undo_bytes
+        return bool(over_steps or over_bytes)
+
+    # Лимит проверяется после команды, а история сбрасывается только перед следующей:
+    # команду, которая превысила лимит, ещё можно отменить
+    def prepare_edit(self):
+        if self.undo_over_limit and not self.isReadOnly():
+            self.clear_undo_history()
+
+    def clear_undo_history(self):
+        # QTextDocument не умеет удалять только старые шаги, поэтому история сбрасывается целиком
+        self.document().clearUndoRedoStacks()
+        self.reset_undo_accounting()
+        self.overwrite_run = None
+        self.undo_history_cleared.emit()
+
+    def reset_undo_accounting(self):
+        self.command_ends = []
+        self.command_bytes = []
+        self.undo_bytes = 0
+        self.last_undo_steps = 0
+        self.new_command = False
+        self.undo_over_limit = False
+
+    # Число команд, которые можно отменить (элементов стека QTextDocument больше)
+    def undo_steps(self):
+        return bisect_right(self.command_ends, self.last_undo_steps)
+
+    # Загрузка текста при заблокированных сигналах документа: иначе QSyntaxHighlighter
+    # ещё до первой отрисовки вызывает highlightBlock из Python для каждого блока
+    def set_plain_text(self, text):
+        self.full_text = text if self.long_line_mode else None
+        self.setReadOnly(self.long_line_mode)
+        document = self.document()
+        document.blockSignals(True)
+        try:
+            self.setPlainText(truncate_long_lines(text) if self.long_line_mode else text)
+        finally:
+            document.blockSignals(False)
+        # Пропущенные обработчики contentsChange и blockCountChanged
+        self.pieces.reset(text)
+        # Позиции Qt — в единицах UTF-16: с символами вне BMP таблица по правкам не ведётся
+        self.pieces_valid = self.long_line_mode or len(text) == document.characterCount() - 1
+        self.reset_undo_accounting()
+        self.overwrite_run = None
+        self.text_version += 1
+        self.update_line_number_area_width()
+        self.highlight_current_line()
+
+    # Смена форматов подсветкой текст не меняет: версия и снимок остаются прежними
+    def bump_text_version(self, position, removed, added):
+        if self.highlighter is not None and self.highlighter.in_highlight_now:
+            return
+        self.text_version += 1
+        # В режиме длинных строк документ только для чтения и хранит обрезанный текст
+        if self.pieces_valid and self.full_text is None:
+            self.update_pieces(position, removed, added)
+
+    # Правка переносится в таблицу кусков; из документа читается только вставленный текст
+    def update_pieces(self, position, removed, added):
+        document = self.document()
+        length = document.characterCount() - 1
+        # Замена всего документа (clear, setPlainText) захватывает и завершающий разделитель абзаца
+        removed = min(removed, self.pieces.length - position)
+        end = min(position + added, length)
+        if removed < 0 or end < position:
+            self.pieces_valid = False
+            return
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        text = plain_text(cursor.selectedText())
+        if len(text) != end - position:
+            self.pieces_valid = False
+            return
+        self.pieces.replace(position, removed, text)
+        if self.pieces.length != length:
+            self.pieces_valid = False
+
+    # Неизменяемый снимок текущего текста; пока документ не менялся, все вызовы получают один объект
+    def snapshot(self):
+        if self.last_snapshot.version != self.text_version:
+            if not self.pieces_valid:
+                text = self.toPlainText()
+                self.pieces.reset(text)
+                self.pieces_valid = len(text) == self.document().characterCount() - 1
+            self.last_snapshot = self.pieces.snapshot(self.text_version)
+        return self.last_snapshot
+
+    def undo_memory(self):
+        return self.undo_steps(), self.undo_bytes
+
 
 # Подсветка синтаксиса 
 from PyQt6.QtGui import QSyntaxHighlighter
 
+HIGHLIGHTED = 1  # userState блока, который уже подсвечен в ленивом режиме
+
 
 class SimpleSyntaxHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent=None):
+    SLICE_MS = 15  # длительность одного фонового шага подсветки
+
+    def __init__(self, parent=None, background_limit=HIGHLIGHT_BACKGROUND_LIMIT):
         super().__init__(parent)
         self.highlighting_rules = []
 
+        # Ленивый режим для больших файлов: сначала видимые блоки, остальное — в простое
+        self.editor = None
+        self.lazy = False
+        self.in_highlight_now = False
+        self.scroll_down = True
+        self.down_block = None
+        self.up_block = None
+        self.background_limit = background_limit
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.highlight_idle_chunk)
+
         keyword_format = QTextCharFormat()
         keyword_format.setForeground(QColor("#569cd6"))
         keyword_format.setFontWeight(QFont.Weight.Bold)
 
-        keywords = ['var', 'const', 'if', 'else', 'while', 'for', 'return', 'true', 'false']
-        for word in keywords:
+        for word in KEYWORDS:
             pattern = QRegularExpression(r'\b' + word + r'\b')
             self.highlighting_rules.append((pattern, keyword_format))
 
@@ -160,11 +491,102 @@ class SimpleSyntaxHighlighter(QSyntaxHighlighter):
         self.highlighting_rules.append((QRegularExpression(r"//.*"), comment_format))
 
     def highlightBlock(self, text):
+        # Для длинной строки — только начало и не дольше HIGHLIGHT_BLOCK_BUDGET
+        deadline = None
+        if len(text) > LONG_LINE_LIMIT:
+            text = text[:LONG_LINE_HIGHLIGHT]
+            deadline = time.perf_counter() + HIGHLIGHT_BLOCK_BUDGET
         for pattern, fmt in self.highlighting_rules:
             iterator = pattern.globalMatch(text)
             while iterator.hasNext():
                 match = iterator.next()
                 self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+
+    def attach_editor(self, editor):
+        self.editor = editor
+        editor.highlighter = self
+        editor.updateRequest.connect(self.on_update_request)
+        self.document().contentsChange.connect(self.reset_idle_position)
+
+    # Загрузка текста без синхронной подсветки всего документа
+    def load_text(self, text):
+        self.idle_timer.stop()
+        self.editor.set_plain_text(text)
+
+        self.lazy = True
+        self.scroll_down = True
+        self.highlight_visible()
+        if self.document().characterCount() <= self.background_limit:
+            self.idle_timer.start(0)
+
+    # rehighlightBlock сам вызывает updateRequest — повторный вход пропускается
+    def on_update_request(self, rect, dy):
+        if not self.lazy or self.in_highlight_now:
+            return
+        if dy:
+            self.scroll_down = dy < 0
+        self.highlight_visible()
+
+    # Правка текста сбивает сохранённые блоки; смена форматов при подсветке — нет
+    def reset_idle_position(self, position, removed, added):
+        if self.in_highlight_now:
+            return
+        self.down_block = None
+        self.up_block = None
+
+    def highlight_now(self, block):
+        if block.userState() != HIGHLIGHTED:
+            self.in_highlight_now = True
+            try:
+                self.rehighlightBlock(block)
+            finally:
+                self.in_highlight_now = False
+            block.setUserState(HIGHLIGHTED)
+
+    def highlight_visible(self):
+        if not self.lazy:
+            return
+        first = self.editor.firstVisibleBlock()
+        offset = self.editor.contentOffset()
+        height = self.editor.viewport().height()
+
+        block = first
+        while block.isValid() and self.editor.blockBoundingGeometry(block).translated(offset).top() <= height:
+            self.highlight_now(block)
+            block = block.next()
+
+        # Фоновая подсветка продолжается от краёв видимой области
+        self.down_block = block
+        self.up_block = first.previous()
+
+    def next_idle_block(self, down):
+        block = self.down_block if down else self.up_block
+        while block is not None and block.isValid():
+            following = block.next() if down else block.previous()
+            if down:
+                self.down_block = following
+            else:
+                self.up_block = following
+            if block.userState() != HIGHLIGHTED:
+                return block
+            block = following
+        return None
+
+    # Один квант фоновой подсветки; первым идёт направление прокрутки
+    def highlight_idle_chunk(self):
+        if self.down_block is None and self.up_block is None:
+            self.highlight_visible()
+
+        deadline = time.perf_counter() + self.SLICE_MS / 1000
+        while time.perf_counter() < deadline:
+            block = self.next_idle_block(self.scroll_down) or self.next_idle_block(not self.scroll_down)
+            if block is None:
+                self.idle_timer.stop()
+                self.lazy = False
+                return
+            self.highlight_now(block)
 
 
 # Окно справки 
@@ -267,12 +689,36 @@ class HelpWindow(QDialog):
 
         text_menu = QTreeWidgetItem([tr("Меню Текст")])
 
-        for item_text in [tr("Постановка задачи"), tr("Грамматика"), tr("Классификация грамматики"),
-                          tr("Метод анализа"), tr("Тестовый пример"), tr("Список литературы"),
+        grammar = QTreeWidgetItem([tr("Грамматика")])
+        grammar.setData(0, Qt.ItemDataRole.UserRole, f"""
+        <h2>{tr('Грамматика')}</h2>
+        <p><b>{tr('Назначение')}:</b> {tr('Загрузка грамматики из файла (.txt, .bnf, .g).')}</p>
+        <p>{tr("Правила записываются в виде E -> E '+' T | T; нетерминалы — левые части правил и имена в угловых скобках, остальные символы — терминалы.")}</p>
+        <p>{tr('При загрузке строятся таблицы LR-анализа; они кешируются на диске, и неизменённая грамматика повторно загружается из кеша.')}</p>
+        """)
+
+        classify = QTreeWidgetItem([tr("Классификация грамматики")])
+        classify.setData(0, Qt.ItemDataRole.UserRole, f"""
+        <h2>{tr('Классификация грамматики')}</h2>
+        <p>{tr('Показывает тип загруженной грамматики по Хомскому и её принадлежность к классам LL(1), LR(1) и LALR(1).')}</p>
+        """)
+
+        method = QTreeWidgetItem([tr("Метод анализа")])
+        method.setData(0, Qt.ItemDataRole.UserRole, f"""
+        <h2>{tr('Метод анализа')}</h2>
+        <p>{tr('Восходящий табличный анализ: используется таблица LALR(1), а если в ней есть конфликты — каноническая таблица LR(1).')}</p>
+        <p>{tr('Показывает выбранный метод и число состояний таблицы.')}</p>
+        """)
+
+        # Остальные разделы меню Текст пока не заполнены
+        placeholders = []
+        for item_text in [tr("Постановка задачи"), tr("Тестовый пример"), tr("Список литературы"),
                           tr("Исходный код программы")]:
             item = QTreeWidgetItem([item_text])
             item.setData(0, Qt.ItemDataRole.UserRole, f"<h2>{item_text}</h2><p>{tr('Будет реализовано в следующих работах.')}</p>")
-            text_menu.addChild(item)
+            placeholders.append(item)
+
+        text_menu.addChildren([placeholders[0], grammar, classify, method] + placeholders[1:])
 
         run_menu = QTreeWidgetItem([tr("Меню Пуск")])
         run = QTreeWidgetItem([f"{tr('Запустить анализатор')} (F5)"])
@@ -280,7 +726,7 @@ class HelpWindow(QDialog):
         <h2>{tr('Запустить анализатор')}</h2>
         <p>{tr('Предназначен для запуска синтаксического анализа текста.')}</p>
         <p>{tr('Результаты анализа выводятся в нижней области окна.')}</p>
-        <p>{tr('В текущей лабораторной работе анализатор реализован как заглушка.')}</p>
+        <p>{tr('Если загружена грамматика, поток лексем разбирается LR-анализатором по её таблице; синтаксические ошибки попадают в таблицу ошибок.')}</p>
         """)
         run_menu.addChild(run)
 
@@ -294,7 +740,7 @@ class HelpWindow(QDialog):
         limits.setData(0, Qt.ItemDataRole.UserRole, f"""
         <h2>{tr("Ограничения текущей версии")}</h2>
         <ul>
-            <li>{tr("Синтаксический анализатор не реализован.")}</li>
+            <li>{tr("Синтаксический анализ выполняется только для грамматики с бесконфликтной таблицей LR(1) или LALR(1).")}</li>
             <li>{tr("Подсветка синтаксиса присутствует, но базовая.")}</li>
             <li>{tr("Работа с несколькими вкладками реализована.")}</li>
             <li>{tr("Поддерживается только .txt.")}</li>
@@ -320,8 +766,226 @@ class HelpWindow(QDialog):
                 self.content.clear()
 
 
+# Таблица ошибок по файлам: строки одного файла идут подряд, поэтому замена
+# ошибок файла затрагивает только его строки. Сообщения хранятся ключами
+# перевода и переводятся при отображении.
+class ErrorTableModel(QAbstractTableModel):
+    def __init__(self, translate, parent=None):
+        super().__init__(parent)
+        self.translate = translate
+        self.keys = []     # файлы в порядке строк таблицы ("" — несохранённый документ)
+        self.names = {}    # ключ -> отображаемое имя файла
+        self.errors = {}   # ключ -> [(строка, позиция, сообщение)]
+        self.starts = [0]  # первая строка каждого файла; последний элемент — число строк
+
+    def set_file_errors(self, key, name, errors):
+        self.remove_file(key)
+        if not errors:
+            return
+        first = self.starts[-1]
+        self.beginInsertRows(QModelIndex(), first, first + len(errors) - 1)
+        self.keys.append(key)
+        self.names[key] = name
+        self.errors[key] = list(errors)
+        self.starts.append(first + len(errors))
+        self.endInsertRows()
+
+    def remove_file(self, key):
+        rows = self.errors.get(key)
+        if rows is None:
+            return
+        i = self.keys.index(key)
+        first = self.starts[i]
+        self.beginRemoveRows(QModelIndex(), first, first + len(rows) - 1)
+        del self.keys[i]
+        del self.names[key]
+        del self.errors[key]
+        self.starts[i:] = [start - len(rows) for start in self.starts[i + 1:]]
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.keys = []
+        self.names = {}
+        self.errors = {}
+        self.starts = [0]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.starts[-1]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 4
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        i = bisect_right(self.starts, row) - 1
+        key = self.keys[i]
+        line, col, message = self.errors[key][row - self.starts[i]]
+        column = index.column()
+        if column == 0:
+            return self.names[key] or self.translate("Новый документ")
+        if column == 1:
+            return str(line)
+        if column == 2:
+            return str(col)
+        return self.translate(message)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+            return None
+        labels = ["Файл", "Строка", "Позиция", "Сообщение"]
+        return self.translate(labels[section])
+
+
+# Таблица лексем: модель читает напрямую из массивов TokenStore,
+# фильтр по типу — массив номеров строк, само хранилище не копируется
+class TokenTableModel(QAbstractTableModel):
+    MAX_LEXEME_LENGTH = 200
+
+    def __init__(self, translate, parent=None):
+        super().__init__(parent)
+        self.translate = translate
+        self.store = TokenStore("")
+        self.version = -1  # версия текста редактора, по которой построено хранилище
+        self.kind = None
+        self.rows = None  # None — все лексемы, иначе номера лексем выбранного типа
+
+    def set_store(self, store, version):
+        self.beginResetModel()
+        self.store = store
+        self.version = version
+        self.rows = self.filtered_rows()
+        self.endResetModel()
+
+    def set_filter(self, kind):
+        self.beginResetModel()
+        self.kind = kind
+        self.rows = self.filtered_rows()
+        self.endResetModel()
+
+    def filtered_rows(self):
+        if self.kind is None:
+            return None
+        kind = self.kind
+        return array("l", (i for i, k in enumerate(self.store.kinds) if k == kind))
+
+    def token_index(self, row):
+        return self.rows[row] if self.rows is not None else row
+
+    # Строка таблицы для номера лексемы; для отфильтрованной таблицы — двоичный поиск
+    def row_of(self, index):
+        if self.rows is None:
+            return index
+        row = bisect_left(self.rows, index)
+        if row < len(self.rows) and self.rows[row] == index:
+            return row
+        return -1
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self.rows is not None else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 5
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        store = self.store
+        i = self.token_index(index.row())
+        column = index.column()
+        if column == 0:
+            return str(store.kinds[i])
+        if column == 1:
+            return self.translate(KIND_NAMES[store.kinds[i]])
+        if column == 2:
+            length = min(store.lengths[i], self.MAX_LEXEME_LENGTH)
+            return store.text[store.offsets[i]:store.offsets[i] + length]
+        if column == 3:
+            return str(store.lines[i])
+        col = store.cols[i]
+        return f"{col}–{col + store.lengths[i] - 1}"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+            return None
+        labels = ["Код", "Тип", "Лексема", "Строка", "Позиция"]
+        return self.translate(labels[section])
+
+
+# Палитра «Перейти к символу»: нечёткий поиск объявлений по индексу проекта
+class SymbolPalette(QDialog):
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.index = index
+        self.location = None
+        self.setWindowTitle(self.parent.tr("Перейти к символу"))
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+        self.query = QLineEdit()
+        self.results = QListWidget()
+        layout.addWidget(self.query)
+        layout.addWidget(self.results)
+
+        self.query.textChanged.connect(self.update_results)
+        self.query.returnPressed.connect(self.accept_current)
+        self.results.itemActivated.connect(self.accept_item)
+
+    def update_results(self, text):
+        self.results.clear()
+        for name, path, line, col in self.index.search(text):
+            item = QListWidgetItem(f"{name}    {self.index.relative(path)}:{line}")
+            item.setData(Qt.ItemDataRole.UserRole, (path, line, col))
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def accept_current(self):
+        item = self.results.currentItem()
+        if item:
+            self.accept_item(item)
+
+    def accept_item(self, item):
+        self.location = item.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+
+
+# Лимиты истории отмены (0 — без ограничения)
+class UndoLimitsDialog(QDialog):
+    def __init__(self, max_steps, max_megabytes, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle(self.parent.tr("Лимит истории отмены"))
+
+        layout = QFormLayout(self)
+        self.steps = QSpinBox()
+        self.steps.setRange(0, 1_000_000)
+        self.steps.setSpecialValueText(self.parent.tr("без ограничения"))
+        self.steps.setValue(max_steps)
+        self.megabytes = QSpinBox()
+        self.megabytes.setRange(0, 16_384)
+        self.megabytes.setSpecialValueText(self.parent.tr("без ограничения"))
+        self.megabytes.setValue(max_megabytes)
+        layout.addRow(self.parent.tr("Шагов отмены:"), self.steps)
+        layout.addRow(self.parent.tr("Памяти, МБ:"), self.megabytes)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+
 # Главное окно
 class Compiler(QMainWindow):
+    full_tokens_ready = pyqtSignal(object, int)  # TokenStore, версия текста
+    symbol_index_ready = pyqtSignal(str, str)  # каталог проекта, текст ошибки ("" — индекс построен)
+
     def __init__(self):
         super().__init__()
         self.translator = Translator()
@@ -335,6 +999,20 @@ class Compiler(QMainWindow):
         self.text_modified = False
         self.current_encoding = "UTF-8"
         self.insert_mode = True  # True = Вставка, False = Замена
+        self.watcher = None
+
+        # Последний анализ: хеш текста и ошибки (ключи сообщений до перевода)
+        self.analysis_hash = ""
+        self.analysis_errors = []
+
+        # Загруженная грамматика и построенные по ней таблицы анализа
+        self.grammar_file = None
+        self.grammar_tables = None
+
+        # Индекс символов проекта: каталог наблюдения или папка, открытая как проект
+        self.project_folder = None
+        self.symbol_index = None
+        self.indexing_dirs = set()  # каталоги, индекс которых строится в фоне
 
         # Статусная строка
         self.statusBar = QStatusBar()
@@ -344,10 +1022,12 @@ class Compiler(QMainWindow):
         self.mode_label = QLabel(self.tr("Вставка"))
         self.stats_label = QLabel(f"0 {self.tr('символов')} | 0 {self.tr('слов')}")
         self.encoding_label = QLabel(self.tr("UTF-8"))
+        self.undo_label = QLabel()
 
         self.statusBar.addPermanentWidget(self.cursor_label)
         self.statusBar.addPermanentWidget(self.mode_label)
         self.statusBar.addPermanentWidget(self.stats_label)
+        self.statusBar.addPermanentWidget(self.undo_label)
         self.statusBar.addPermanentWidget(self.encoding_label)
         self.statusBar.showMessage(self.tr("Готово"))
 
@@ -358,16 +1038,24 @@ class Compiler(QMainWindow):
 
         self.editor.textChanged.connect(self.on_text_changed)
         self.editor.cursorPositionChanged.connect(self.update_cursor_position)
+        self.editor.cursorPositionChanged.connect(self.sync_token_view)
+        self.editor.undo_history_cleared.connect(self.on_undo_history_cleared)
+        self.editor.overwrite_mode_changed.connect(self.on_overwrite_mode_changed)
 
         # Таймер для статистики
         self.stats_timer = QTimer(self)
         self.stats_timer.setSingleShot(True)
         self.stats_timer.timeout.connect(self.update_text_stats)
-        self.editor.textChanged.connect(lambda: self.stats_timer.start(300))
 
         self.update_cursor_position()
         self.update_text_stats()
 
+        # Сессия: периодическое сохранение и восстановление после первой отрисовки окна
+        self.session_timer = QTimer(self)
+        self.session_timer.timeout.connect(self.save_session)
+        self.session_timer.start(60_000)
+        QTimer.singleShot(0, self.restore_session)
+
     def init_ui(self):
         central = QWidget()
         self.setCentralWidget(central)
@@ -378,7 +1066,8 @@ class Compiler(QMainWindow):
         layout.addWidget(self.splitter)
 
         self.editor = CodeEditor()
-        highlighter = SimpleSyntaxHighlighter(self.editor.document())  # ← подсветка подключается здесь
+        self.highlighter = SimpleSyntaxHighlighter(self.editor.document())  # ← подсветка подключается здесь
+        self.highlighter.attach_editor(self.editor)
         self.splitter.addWidget(self.editor)
 
         # Область результатов
@@ -391,13 +1080,41 @@ class Compiler(QMainWindow):
         self.output.setFont(QFont("Consolas", 11))
         self.results_tabs.addTab(self.output, self.tr("Результаты"))
 
-        self.errors_table = QTableWidget()
-        self.errors_table.setColumnCount(3)
-        self.errors_table.setHorizontalHeaderLabels([self.tr("Строка"), self.tr("Позиция"), self.tr("Сообщение")])
-        self.errors_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-        self.errors_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.error_model = ErrorTableModel(self.tr, self)
+        self.errors_table = QTableView()
+        self.errors_table.setModel(self.error_model)
+        self.errors_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.errors_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
         self.results_tabs.addTab(self.errors_table, self.tr("Ошибки"))
 
+        # Вкладка лексем
+        self.tokens_widget = QWidget()
+        tokens_layout = QVBoxLayout(self.tokens_widget)
+        tokens_layout.setContentsMargins(0, 0, 0, 0)
+        self.token_filter = QComboBox()
+        self.token_filter.addItem(self.tr("Все лексемы"), None)
+        for kind, name in KIND_NAMES.items():
+            self.token_filter.addItem(self.tr(name), kind)
+        self.token_filter.currentIndexChanged.connect(
+            lambda _: self.token_model.set_filter(self.token_filter.currentData()))
+        tokens_layout.addWidget(self.token_filter)
+
+        self.token_model = TokenTableModel(self.tr, self)
+        self.tokens_view = QTableView()
+        self.tokens_view.setModel(self.token_model)
+        self.tokens_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tokens_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tokens_view.verticalHeader().hide()
+        # Фиксированная высота строк: представление не измеряет миллион строк
+        self.tokens_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.tokens_view.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.tokens_view.selectionModel().currentRowChanged.connect(self.on_token_selected)
+        tokens_layout.addWidget(self.tokens_view)
+        self.results_tabs.addTab(self.tokens_widget, self.tr("Лексемы"))
+        self.syncing_tokens = False
+        self.full_tokens_ready.connect(self.on_full_tokens_ready)
+        self.symbol_index_ready.connect(self.on_symbol_index_ready)
+
         results_layout.addWidget(self.results_tabs)
         self.splitter.addWidget(self.results_widget)
 
@@ -412,6 +1129,9 @@ class Compiler(QMainWindow):
         self.act_open.setShortcut(QKeySequence("Ctrl+O"))
         self.act_open.triggered.connect(self.open_file)
 
+        self.act_open_project = QAction(self.tr("Открыть папку проекта"), self)
+        self.act_open_project.triggered.connect(self.open_project_folder)
+
         self.act_save = QAction(self.tr("Сохранить"), self)
         self.act_save.setShortcut(QKeySequence("Ctrl+S"))
         self.act_save.triggered.connect(self.save_file)
@@ -432,6 +1152,9 @@ class Compiler(QMainWindow):
         self.act_redo.setShortcut(QKeySequence("Ctrl+Y"))
         self.act_redo.triggered.connect(self.editor.redo)
 
+        self.act_undo_limits = QAction(self.tr("Лимит истории отмены"), self)
+        self.act_undo_limits.triggered.connect(self.show_undo_limits)
+
         self.act_cut = QAction(self.tr("Вырезать"), self)
         self.act_cut.setShortcut(QKeySequence("Ctrl+X"))
         self.act_cut.triggered.connect(self.editor.cut)
@@ -452,10 +1175,26 @@ class Compiler(QMainWindow):
         self.act_select_all.setShortcut(QKeySequence("Ctrl+A"))
         self.act_select_all.triggered.connect(self.editor.selectAll)
 
+        self.act_goto_definition = QAction(self.tr("Перейти к объявлению"), self)
+        self.act_goto_definition.setShortcut(QKeySequence("F12"))
+        self.act_goto_definition.triggered.connect(self.goto_definition)
+
+        self.act_find_references = QAction(self.tr("Найти использования"), self)
+        self.act_find_references.setShortcut(QKeySequence("Shift+F12"))
+        self.act_find_references.triggered.connect(self.find_references)
+
+        self.act_goto_symbol = QAction(self.tr("Перейти к символу"), self)
+        self.act_goto_symbol.setShortcut(QKeySequence("Ctrl+T"))
+        self.act_goto_symbol.triggered.connect(self.show_symbol_palette)
+
         self.act_run = QAction(self.tr("Пуск"), self)
         self.act_run.setShortcut(QKeySequence("F5"))
         self.act_run.triggered.connect(self.run_analyzer)
 
+        self.act_watch = QAction(self.tr("Наблюдение за папкой"), self)
+        self.act_watch.setCheckable(True)
+        self.act_watch.triggered.connect(self.toggle_watch)
+
         self.act_task     = QAction(self.tr("Постановка задачи"), self)
         self.act_grammar  = QAction(self.tr("Грамматика"), self)
         self.act_classify = QAction(self.tr("Классификация грамматики"), self)
@@ -464,10 +1203,13 @@ class Compiler(QMainWindow):
         self.act_refs     = QAction(self.tr("Список литературы"), self)
         self.act_source   = QAction(self.tr("Исходный код программы"), self)
 
-        for act in [self.act_task, self.act_grammar, self.act_classify,
-                    self.act_method, self.act_example, self.act_refs, self.act_source]:
+        for act in [self.act_task, self.act_example, self.act_refs, self.act_source]:
             act.triggered.connect(lambda _, t=act.text(): self.show_placeholder(t))
 
+        self.act_grammar.triggered.connect(self.open_grammar)
+        self.act_classify.triggered.connect(self.show_classification)
+        self.act_method.triggered.connect(self.show_analysis_method)
+
         self.act_help = QAction(self.tr("Вызов справки"), self)
         self.act_help.setShortcut(QKeySequence("F1"))
         self.act_help.triggered.connect(self.show_help)
@@ -487,6 +1229,7 @@ class Compiler(QMainWindow):
         self.menu_file = mb.addMenu(self.tr("Файл"))
         self.menu_file.addAction(self.act_new)
         self.menu_file.addAction(self.act_open)
+        self.menu_file.addAction(self.act_open_project)
         self.menu_file.addAction(self.act_save)
         self.menu_file.addAction(self.act_save_as)
         self.menu_file.addSeparator()
@@ -495,6 +1238,7 @@ class Compiler(QMainWindow):
         self.menu_edit = mb.addMenu(self.tr("Правка"))
         self.menu_edit.addAction(self.act_undo)
         self.menu_edit.addAction(self.act_redo)
+        self.menu_edit.addAction(self.act_undo_limits)
         self.menu_edit.addSeparator()
         self.menu_edit.addAction(self.act_cut)
         self.menu_edit.addAction(self.act_copy)
@@ -502,6 +1246,10 @@ class Compiler(QMainWindow):
         self.menu_edit.addAction(self.act_delete)
         self.menu_edit.addSeparator()
         self.menu_edit.addAction(self.act_select_all)
+        self.menu_edit.addSeparator()
+        self.menu_edit.addAction(self.act_goto_definition)
+        self.menu_edit.addAction(self.act_find_references)
+        self.menu_edit.addAction(self.act_goto_symbol)
 
         self.menu_text = mb.addMenu(self.tr("Текст"))
         self.menu_text.addAction(self.act_task)
@@ -514,6 +1262,7 @@ class Compiler(QMainWindow):
 
         self.menu_run = mb.addMenu(self.tr("Пуск"))
         self.menu_run.addAction(self.act_run)
+        self.menu_run.addAction(self.act_watch)
 
         self.menu_lang = mb.addMenu(self.tr("Язык"))
         self.menu_lang.addAction(self.act_lang_ru)
@@ -573,17 +1322,23 @@ class Compiler(QMainWindow):
 
         self.act_new.setText(self.tr("Создать"))
         self.act_open.setText(self.tr("Открыть"))
+        self.act_open_project.setText(self.tr("Открыть папку проекта"))
         self.act_save.setText(self.tr("Сохранить"))
         self.act_save_as.setText(self.tr("Сохранить как"))
         self.act_exit.setText(self.tr("Выход"))
         self.act_undo.setText(self.tr("Отменить"))
         self.act_redo.setText(self.tr("Повторить"))
+        self.act_undo_limits.setText(self.tr("Лимит истории отмены"))
         self.act_cut.setText(self.tr("Вырезать"))
         self.act_copy.setText(self.tr("Копировать"))
         self.act_paste.setText(self.tr("Вставить"))
         self.act_delete.setText(self.tr("Удалить"))
         self.act_select_all.setText(self.tr("Выделить все"))
+        self.act_goto_definition.setText(self.tr("Перейти к объявлению"))
+        self.act_find_references.setText(self.tr("Найти использования"))
+        self.act_goto_symbol.setText(self.tr("Перейти к символу"))
         self.act_run.setText(self.tr("Пуск"))
+        self.act_watch.setText(self.tr("Наблюдение за папкой"))
         self.act_help.setText(self.tr("Вызов справки"))
         self.act_about.setText(self.tr("О программе"))
         self.act_lang_ru.setText(self.tr("Русский"))
@@ -591,11 +1346,14 @@ class Compiler(QMainWindow):
 
         self.results_tabs.setTabText(0, self.tr("Результаты"))
         self.results_tabs.setTabText(1, self.tr("Ошибки"))
-        self.errors_table.setHorizontalHeaderLabels([
-            self.tr("Строка"),
-            self.tr("Позиция"),
-            self.tr("Сообщение")
-        ])
+        self.results_tabs.setTabText(2, self.tr("Лексемы"))
+        self.token_filter.setItemText(0, self.tr("Все лексемы"))
+        for i, name in enumerate(KIND_NAMES.values(), 1):
+            self.token_filter.setItemText(i, self.tr(name))
+        self.token_model.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, 4)
+        self.tokens_view.viewport().update()
+        self.error_model.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, 3)
+        self.errors_table.viewport().update()
 
         self.statusBar.showMessage(self.tr("Готово") if not self.text_modified else self.tr("Изменено"))
 
@@ -603,7 +1361,12 @@ class Compiler(QMainWindow):
         self.update_text_stats()
 
     def on_text_changed(self):
-        if not self.text_modified and self.editor.toPlainText().strip():
+        # Смена форматов при ленивой подсветке тоже вызывает textChanged, но текст не меняет
+        if self.highlighter.in_highlight_now:
+            return
+        self.stats_timer.start(300)
+        self.invalidate_tokens()
+        if not self.text_modified and not self.editor.snapshot().is_blank():
             self.text_modified = True
             self.update_window_title()
             self.statusBar.showMessage(self.tr("Изменено"))
@@ -626,11 +1389,30 @@ class Compiler(QMainWindow):
         self.mode_label.setText(mode)
 
     def update_text_stats(self):
-        text = self.editor.toPlainText()
-        chars = len(text)
-        words = len(text.split()) if text.strip() else 0
+        snapshot = self.editor.snapshot()
+        chars = len(snapshot)
+        words = snapshot.word_count()
         self.stats_label.setText(f"{chars} {self.tr('символов')} | {words} {self.tr('слов')}")
 
+        self.update_undo_label()
+
+    def update_undo_label(self):
+        steps, undo_bytes = self.editor.undo_memory()
+        self.undo_label.setText(f"{self.tr('Отмена:')} {steps} | {undo_bytes // 1024} {self.tr('КБ')}")
+
+    def on_overwrite_mode_changed(self, enabled):
+        self.insert_mode = not enabled
+        self.update_cursor_position()
+
+    def on_undo_history_cleared(self):
+        self.update_undo_label()
+        self.statusBar.showMessage(self.tr("История отмены очищена: превышен лимит"))
+
+    def show_undo_limits(self):
+        dialog = UndoLimitsDialog(self.editor.max_undo_steps, self.editor.max_undo_bytes // (1024 * 1024), self)
+        if dialog.exec():
+            self.editor.set_undo_limits(dialog.steps.value(), dialog.megabytes.value() * 1024 * 1024)
+
     def maybe_save(self) -> bool:
         if not self.text_modified:
             return True
@@ -650,6 +1432,7 @@ class Compiler(QMainWindow):
 
     def new_file(self):
         if self.maybe_save():
+            self.editor.set_long_line_mode(False)
             self.editor.clear()
             self.current_file = None
             self.text_modified = False
@@ -661,25 +1444,44 @@ class Compiler(QMainWindow):
             return
         fname, _ = QFileDialog.getOpenFileName(self, self.tr("Открыть"), "", "Text files (*.txt);;All files (*.*)")
         if fname:
-            try:
-                with open(fname, encoding='utf-8') as f:
-                    self.editor.setPlainText(f.read())
-                self.current_file = fname
-                self.text_modified = False
-                self.update_window_title()
-                self.statusBar.showMessage(f"{self.tr('Открыт:')} {os.path.basename(fname)}")
-            except Exception as e:
-                QMessageBox.warning(self, self.tr("Ошибка"), f"{self.tr('Не удалось открыть')}:\n{e}")
+            self.open_path(fname)
+
+    def open_path(self, fname: str) -> bool:
+        try:
+            with open(fname, encoding='utf-8') as f:
+                self.load_text(f.read())
+            self.current_file = fname
+            self.text_modified = False
+            self.update_window_title()
+            self.show_opened_message()
+            return True
+        except Exception as e:
+            QMessageBox.warning(self, self.tr("Ошибка"), f"{self.tr('Не удалось открыть')}:\n{e}")
+            return False
+
+    def load_text(self, text: str):
+        self.editor.set_long_line_mode(has_long_lines(text))
+        self.highlighter.load_text(text)
+        self.invalidate_tokens()
+
+    def show_opened_message(self):
+        message = f"{self.tr('Открыт:')} {os.path.basename(self.current_file)}"
+        if self.editor.long_line_mode:
+            message += f" | {self.tr('Режим длинных строк: строки обрезаны, только чтение')}"
+        self.statusBar.showMessage(message)
 
     def save_file(self) -> bool:
         if not self.current_file:
             return self.save_as_file()
         try:
             with open(self.current_file, 'w', encoding='utf-8') as f:
-                f.write(self.editor.toPlainText())
+                for chunk in self.editor.snapshot().chunks():
+                    f.write(chunk)
             self.text_modified = False
             self.update_window_title()
             self.statusBar.showMessage(self.tr("Сохранено"))
+            if self.symbol_index and self.in_project(self.current_file):
+                self.symbol_index.update_file(self.current_file)
             return True
         except Exception as e:
             QMessageBox.warning(self, self.tr("Ошибка"), f"{self.tr('Не удалось сохранить')}:\n{e}")
@@ -688,43 +1490,420 @@ class Compiler(QMainWindow):
     def save_as_file(self) -> bool:
         fname, _ = QFileDialog.getSaveFileName(self, self.tr("Сохранить как"), "", "Text files (*.txt);;All files (*.*)")
         if fname:
+            # Строки несохранённого документа теперь относятся к файлу и пересоздаются при анализе
+            if not self.current_file:
+                self.error_model.remove_file("")
             self.current_file = fname
             return self.save_file()
         return False
 
     def closeEvent(self, event):
         if self.maybe_save():
+            if self.watcher:
+                self.watcher.stop()
+            self.save_session()
+            if self.symbol_index:
+                self.symbol_index.close()
             event.accept()
         else:
             event.ignore()
 
     def run_analyzer(self):
         self.output.clear()
-        self.errors_table.setRowCount(0)
+        self.clear_analysis_errors()
 
-        text = self.editor.toPlainText().strip()
-        if not text:
+        snapshot = self.editor.snapshot()
+        text = snapshot.text
+        if not text.strip():
             self.output.append(self.tr("Текст пустой"))
             self.statusBar.showMessage(self.tr("Анализ не выполнен"))
             return
 
         self.output.append("Запуск анализатора...")
         self.output.append(f"{self.tr('Длина текста')}: {len(text)} {self.tr('символов')}")
+
+        # Тот же анализ, что и в LSP-сервере (lsp_server.py)
+        tokens, errors, definitions = analyze(text)
+        self.token_model.set_store(tokens, snapshot.version)
+        self.output.append(f"{self.tr('Лексем')}: {len(tokens)}")
+        self.output.append(f"{self.tr('Объявлений')}: {len(definitions)}")
+        self.output.append(f"{self.tr('Ошибок')}: {len(errors)}")
         self.output.append("\n" + self.tr("Анализ завершён"))
 
-        # Демо-ошибки
-        self.add_error(5, 3, self.tr("Ожидался символ ';' после выражения"))
-        self.add_error(8, 1, self.tr("Неизвестный идентификатор 'addd'"))
-        self.add_error(12, 10, self.tr("Несоответствие типов"))
+        self.analysis_errors = [(error.line, error.col, error.message) for error in errors]
+
+        # Синтаксический анализ по таблицам загруженной грамматики.
+        # На обрезанном по времени потоке лексем конец файла дал бы ложную синтаксическую ошибку
+        lexer_partial = bool(errors) and errors[-1].message == PARTIAL_MESSAGE
+        if lexer_partial:
+            self.start_full_tokenize(text, snapshot.version)
+        if self.grammar_tables and self.grammar_tables.method and lexer_partial:
+            self.output.append(self.tr("Синтаксический анализ пропущен: лексический анализ неполный"))
+        elif self.grammar_tables and self.grammar_tables.method:
+            last_line = snapshot.line_count()
+            end_position = (last_line, len(text) - text.rfind("\n"))
+            try:
+                result = parse(self.grammar_tables, token_symbols(self.grammar_tables, tokens), end_position)
+            except ParseTimeout as e:
+                result = None
+                line, col = e.position
+                self.analysis_errors.append((line, col, PARTIAL_MESSAGE))
+            if result is not None:
+                (line, col), _ = result
+                self.analysis_errors.append((line, col, "Синтаксическая ошибка"))
+            self.output.append(f"{self.tr('Синтаксический анализ')}: {self.grammar_tables.method}")
+
+        self.analysis_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self.show_analysis_errors()
 
         self.statusBar.showMessage(self.tr("Анализ завершён"))
 
-    def add_error(self, line: int, col: int, message: str):
-        row = self.errors_table.rowCount()
-        self.errors_table.insertRow(row)
-        self.errors_table.setItem(row, 0, QTableWidgetItem(str(line)))
-        self.errors_table.setItem(row, 1, QTableWidgetItem(str(col)))
-        self.errors_table.setItem(row, 2, QTableWidgetItem(message))
+    # Вкладке «Лексемы» нужен полный поток: лексер без ограничения времени работает в потоке,
+    # результат применяется, только если текст с тех пор не менялся
+    def start_full_tokenize(self, text, version):
+        self.output.append(self.tr("Полный список лексем строится в фоне"))
+        threading.Thread(target=lambda: self.full_tokens_ready.emit(tokenize(text, budget=0)[0], version),
+                         daemon=True).start()
+
+    def on_full_tokens_ready(self, tokens, version):
+        if version != self.editor.text_version:
+            return
+        self.token_model.set_store(tokens, version)
+        self.output.append(f"{self.tr('Лексем (полный список)')}: {len(tokens)}")
+
+    # Лексемы старой версии текста не соответствуют позициям в редакторе
+    def invalidate_tokens(self):
+        if self.token_model.version != self.editor.text_version and len(self.token_model.store):
+            self.token_model.set_store(TokenStore(""), self.editor.text_version)
+
+    # Строки текущего документа заменяются, ошибки остальных файлов (режим наблюдения) остаются
+    def show_analysis_errors(self):
+        self.clear_analysis_errors()
+        key = self.document_key()
+        self.error_model.set_file_errors(key, self.error_file_name(key) if key else "", self.analysis_errors)
+
+    # Без наблюдения таблица показывает только ошибки последнего анализа
+    def clear_analysis_errors(self):
+        if self.watcher is None:
+            self.error_model.clear()
+        else:
+            self.error_model.remove_file(self.document_key())
+
+    # Ключ файла в таблице ошибок — абсолютный путь, и для F5, и для наблюдения
+    def document_key(self) -> str:
+        return os.path.abspath(self.current_file) if self.current_file else ""
+
+    def error_file_name(self, path: str) -> str:
+        if self.watcher and path.startswith(self.watcher.root + os.sep):
+            return os.path.relpath(path, self.watcher.root)
+        return os.path.basename(path)
+
+    # Режим наблюдения за каталогом
+    def toggle_watch(self, checked: bool):
+        if not checked:
+            if self.watcher:
+                self.watcher.stop()
+                self.watcher = None
+            self.show_analysis_errors()
+            self.statusBar.showMessage(self.tr("Наблюдение остановлено"))
+            return
+
+        directory = QFileDialog.getExistingDirectory(self, self.tr("Наблюдение за папкой"))
+        if not directory:
+            self.act_watch.setChecked(False)
+            return
+
+        self.output.clear()
+        self.error_model.clear()
+        self.watcher = DirectoryWatcher(directory, parent=self)
+        self.watcher.file_analyzed.connect(self.on_watched_file_analyzed)
+        self.watcher.file_removed.connect(self.on_watched_file_removed)
+        self.watcher.start()
+        self.show_analysis_errors()
+        self.statusBar.showMessage(f"{self.tr('Наблюдение:')} {directory}")
+
+    def on_watched_file_analyzed(self, path: str, errors: list):
+        name = self.error_file_name(path)
+        self.error_model.set_file_errors(path, name, [(error.line, error.col, error.message) for error in errors])
+        self.output.append(f"{name}: {self.tr('Ошибок')}: {len(errors)}")
+        if self.symbol_index and self.in_project(path):
+            self.symbol_index.update_file(path)
+
+    def on_watched_file_removed(self, path: str):
+        self.error_model.remove_file(path)
+        if self.symbol_index and self.in_project(path):
+            self.symbol_index.remove_file(path)
+
+    # Синхронизация таблицы лексем с курсором редактора
+    def sync_token_view(self):
+        if self.syncing_tokens or self.token_model.version != self.editor.text_version:
+            return
+        index = self.token_model.store.index_at(self.editor.text_offset(self.editor.textCursor().position()))
+        row = self.token_model.row_of(index) if index >= 0 else -1
+        if row < 0:
+            return
+        self.syncing_tokens = True
+        try:
+            self.tokens_view.selectRow(row)
+            self.tokens_view.scrollTo(self.token_model.index(row, 0))
+        finally:
+            self.syncing_tokens = False
+
+    def on_token_selected(self, current, previous):
+        if self.syncing_tokens or not current.isValid() or self.token_model.version != self.editor.text_version:
+            return
+        offset = self.token_model.store.offsets[self.token_model.token_index(current.row())]
+        self.syncing_tokens = True
+        try:
+            cursor = self.editor.textCursor()
+            cursor.setPosition(self.editor.document_position(offset))
+            self.editor.setTextCursor(cursor)
+            self.editor.centerCursor()
+        finally:
+            self.syncing_tokens = False
+
+    # Навигация по символам
+    # Проект задаётся только явно: обход каталога текущего файла мог бы захватить, например, весь домашний
+    def project_dir(self):
+        if self.watcher:
+            return self.watcher.root
+        return self.project_folder
+
+    def open_project_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, self.tr("Папка проекта"))
+        if directory:
+            self.project_folder = os.path.abspath(directory)
+            self.get_symbol_index()
+
+    def in_project(self, path: str) -> bool:
+        root = self.symbol_index.project_dir
+        return os.path.abspath(path).startswith(root + os.sep)
+
+    # Индекс проекта; при первом обращении обход дерева идёт в потоке со своим соединением SQLite,
+    # а навигация по проекту недоступна, пока он не закончится
+    def get_symbol_index(self):
+        directory = self.project_dir()
+        if directory is None:
+            self.statusBar.showMessage(self.tr("Откройте папку проекта"))
+            return None
+        directory = os.path.abspath(directory)
+        if self.symbol_index is not None and self.symbol_index.project_dir == directory:
+            return self.symbol_index
+        if directory not in self.indexing_dirs:
+            self.indexing_dirs.add(directory)
+            threading.Thread(target=self.build_symbol_index, args=(directory,), daemon=True).start()
+        self.statusBar.showMessage(self.tr("Индексация проекта..."))
+        return None
+
+    def build_symbol_index(self, directory):
+        try:
+            index = SymbolIndex(directory, WATCH_EXTENSIONS)
+            try:
+                index.update_tree()
+            finally:
+                index.close()
+        except Exception as e:
+            self.symbol_index_ready.emit(directory, str(e))
+        else:
+            self.symbol_index_ready.emit(directory, "")
+
+    def on_symbol_index_ready(self, directory, error):
+        self.indexing_dirs.discard(directory)
+        if error:
+            self.statusBar.showMessage(f"{self.tr('Не удалось построить индекс проекта')}: {error}")
+            return
+        current = self.project_dir()
+        if current is None or os.path.abspath(current) != directory:
+            return
+        if self.symbol_index:
+            self.symbol_index.close()
+        self.symbol_index = SymbolIndex(directory, WATCH_EXTENSIONS)
+        self.statusBar.showMessage(self.tr("Индекс проекта готов"))
+
+    def word_under_cursor(self) -> str:
+        cursor = self.editor.textCursor()
+        cursor.select(cursor.SelectionType.WordUnderCursor)
+        return cursor.selectedText()
+
+    def goto_definition(self):
+        name = self.word_under_cursor()
+        if not name:
+            return
+        # Сначала текущий документ (с несохранёнными правками), затем индекс проекта
+        definition = find_definitions(tokenize(self.editor.snapshot().text)[0]).get(name)
+        if definition:
+            self.goto_location(self.current_file, definition.line, definition.col)
+            return
+        index = self.get_symbol_index()
+        if index is None:
+            return
+        locations = index.definitions(name)
+        if locations:
+            self.goto_location(*locations[0])
+        else:
+            self.statusBar.showMessage(f"{self.tr('Объявление не найдено:')} {name}")
+
+    def find_references(self):
+        name = self.word_under_cursor()
+        index = self.get_symbol_index()
+        if not name or index is None:
+            return
+        self.output.clear()
+        self.output.append(f"{self.tr('Использования')} «{name}»:")
+        for path, line, col in index.references(name):
+            self.output.append(f"{index.relative(path)}:{line}:{col}")
+        self.results_tabs.setCurrentIndex(0)
+
+    def show_symbol_palette(self):
+        index = self.get_symbol_index()
+        if index is None:
+            return
+        palette = SymbolPalette(index, self)
+        if palette.exec() and palette.location:
+            self.goto_location(*palette.location)
+
+    def goto_location(self, path, line: int, col: int):
+        if path and (not self.current_file or os.path.abspath(path) != os.path.abspath(self.current_file)):
+            if not self.maybe_save() or not self.open_path(path):
+                return
+        block = self.editor.document().findBlockByNumber(line - 1)
+        if not block.isValid():
+            return
+        cursor = self.editor.textCursor()
+        cursor.setPosition(block.position() + min(col - 1, block.length() - 1))
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        self.editor.setFocus()
+
+    # Сохранение и восстановление сессии
+    def save_session(self):
+        session = Session()
+        session.language = self.translator.lang
+        session.current_file = self.current_file or ""
+        session.cursor_position = self.editor.textCursor().position()
+        session.scroll_value = self.editor.verticalScrollBar().value()
+        session.splitter_sizes = self.splitter.sizes()
+        session.geometry = bytes(self.saveGeometry())
+        session.grammar_file = self.grammar_file or ""
+        session.analysis_hash = self.analysis_hash
+        session.errors = self.analysis_errors
+        session.undo_max_steps = self.editor.max_undo_steps
+        session.undo_max_megabytes = self.editor.max_undo_bytes // (1024 * 1024)
+        session.project_dir = self.project_folder or ""
+        write_session(session)
+
+    def restore_session(self):
+        session = read_session()
+        if session is None:
+            return
+
+        if session.language != self.translator.lang:
+            self.change_language(session.language)
+        if session.geometry:
+            self.restoreGeometry(session.geometry)
+        if session.splitter_sizes:
+            self.splitter.setSizes(session.splitter_sizes)
+        self.editor.set_undo_limits(session.undo_max_steps, session.undo_max_megabytes * 1024 * 1024)
+        if session.project_dir and os.path.isdir(session.project_dir):
+            self.project_folder = session.project_dir
+        if session.grammar_file and os.path.isfile(session.grammar_file):
+            self.load_grammar(session.grammar_file)
+
+        if not session.current_file or not os.path.isfile(session.current_file) or self.text_modified:
+            return
+        try:
+            with open(session.current_file, encoding='utf-8') as f:
+                self.load_text(f.read())
+        except Exception:
+            return
+        self.current_file = session.current_file
+        self.text_modified = False
+        self.update_window_title()
+
+        cursor = self.editor.textCursor()
+        cursor.setPosition(min(session.cursor_position, self.editor.document().characterCount() - 1))
+        self.editor.setTextCursor(cursor)
+        self.editor.verticalScrollBar().setValue(session.scroll_value)
+        self.show_opened_message()
+
+        # Хеш большого файла считается уже после отрисовки документа
+        QTimer.singleShot(0, lambda: self.restore_cached_analysis(session))
+
+    def restore_cached_analysis(self, session):
+        if not session.analysis_hash or self.text_modified:
+            return
+        text = self.editor.snapshot().text
+        if hashlib.sha1(text.encode("utf-8")).hexdigest() != session.analysis_hash:
+            return
+        self.analysis_hash = session.analysis_hash
+        self.analysis_errors = session.errors
+        self.show_analysis_errors()
+
+    # Грамматика: загрузка, классификация, метод анализа
+    def open_grammar(self):
+        fname, _ = QFileDialog.getOpenFileName(self, self.tr("Грамматика"), "",
+                                               "Grammar files (*.txt *.bnf *.g);;All files (*.*)")
+        if fname and self.load_grammar(fname):
+            self.show_grammar_summary()
+
+    def load_grammar(self, path: str) -> bool:
+        cache_dir = os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation), "grammars")
+        try:
+            self.grammar_tables = load_grammar(path, cache_dir)
+        except (GrammarError, OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, self.tr("Ошибка"), f"{self.tr('Не удалось загрузить грамматику')}:\n{e}")
+            return False
+        self.grammar_file = path
+        self.statusBar.showMessage(f"{self.tr('Грамматика:')} {os.path.basename(path)}")
+        return True
+
+    def ensure_grammar(self) -> bool:
+        if self.grammar_tables is None:
+            self.open_grammar()
+        return self.grammar_tables is not None
+
+    def show_grammar_summary(self):
+        tables = self.grammar_tables
+        self.output.clear()
+        self.output.append(f"{self.tr('Грамматика:')} {self.grammar_file}")
+        self.output.append(f"{self.tr('Правил')}: {tables.rule_count}")
+        self.output.append(f"{self.tr('Терминалов')}: {len(tables.terminals)}")
+        if tables.method:
+            self.output.append(f"{self.tr('Состояний')}: {tables.state_count}")
+        self.output.append(f"{self.tr('Время построения таблиц')}: {tables.build_time * 1000:.1f} {self.tr('мс')}")
+        self.results_tabs.setCurrentIndex(0)
+
+    def show_classification(self):
+        if not self.ensure_grammar():
+            return
+        tables = self.grammar_tables
+        types = {
+            0: self.tr("тип 0 — грамматика общего вида"),
+            1: self.tr("тип 1 — контекстно-зависимая"),
+            2: self.tr("тип 2 — контекстно-свободная"),
+            3: self.tr("тип 3 — регулярная"),
+        }
+        yes, no = self.tr("да"), self.tr("нет")
+        QMessageBox.information(
+            self,
+            self.tr("Классификация грамматики"),
+            f"{self.tr('По Хомскому')}: {types[tables.chomsky_type]}\n\n"
+            f"LL(1): {yes if tables.is_ll1 else no}\n"
+            f"LR(1): {yes if tables.is_lr1 else no}\n"
+            f"LALR(1): {yes if tables.is_lalr1 else no}"
+        )
+
+    def show_analysis_method(self):
+        if not self.ensure_grammar():
+            return
+        tables = self.grammar_tables
+        if tables.method:
+            text = (f"{self.tr('Восходящий табличный анализ')} {tables.method}\n"
+                    f"{self.tr('Состояний')}: {tables.state_count}")
+        else:
+            text = self.tr("Для грамматики нельзя построить бесконфликтную таблицу LR(1)")
+        QMessageBox.information(self, self.tr("Метод анализа"), text)
 
     def show_placeholder(self, title: str):
         QMessageBox.information(self, title, f"{self.tr('Раздел')} «{title}»\n\n{self.tr('будет реализован позже')}.")
@@ -766,6 +1945,7 @@ class Compiler(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setApplicationName("Compiler")
     window = Compiler()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
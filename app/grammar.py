@@ -0,0 +1,424 @@
+import os
+import re
+import time
+import pickle
+import hashlib
+
+from lexer import IDENTIFIER, NUMBER, STRING, COMMENT, PASS_TIME_BUDGET
+
+
+# Загрузка грамматики из файла, классификация и построение таблиц LR-анализа.
+# Таблицы кешируются на диске по хешу текста грамматики.
+#
+# Формат файла:
+#   E  -> E '+' T | T
+#   T  -> id | '(' E ')' | ε
+# Нетерминалы — символы в левых частях правил и <в угловых скобках>,
+# всё остальное — терминалы; кавычки позволяют записать '|' или '->' как терминал.
+
+EPSILON_NAMES = ("ε", "eps", "epsilon")
+END = "$"
+CACHE_VERSION = 1
+
+SHIFT = 0
+REDUCE = 1
+ACCEPT = 2
+
+_SYMBOL_RE = re.compile(r"'[^']*'|\"[^\"]*\"|<[^>]+>|\S+")
+
+
+class GrammarError(Exception):
+    pass
+
+
+# Анализ не уложился в отведённое время; position — где он остановился
+class ParseTimeout(Exception):
+    def __init__(self, position):
+        super().__init__(position)
+        self.position = position
+
+
+class Grammar:
+    def __init__(self, rules, start, nonterminals, terminals):
+        self.rules = rules  # [(левая часть, правая часть)] — кортежи символов
+        self.start = start
+        self.nonterminals = nonterminals
+        self.terminals = terminals
+
+    def is_context_free(self):
+        return all(len(lhs) == 1 and lhs[0] in self.nonterminals for lhs, _ in self.rules)
+
+
+def parse_grammar(text):
+    lines = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("|") and lines:
+            lines[-1] += " " + line
+        else:
+            lines.append(line)
+
+    raw_rules = []
+    quoted = set()
+    for number, line in enumerate(lines, 1):
+        symbols = _SYMBOL_RE.findall(line)
+        arrows = [i for i, s in enumerate(symbols) if s in ("->", "::=", "→")]
+        if not arrows or arrows[0] == 0:
+            raise GrammarError(f"Правило {number}: нет левой части или знака '->'")
+        split = arrows[0]
+
+        def symbol(s):
+            if len(s) >= 2 and s[0] == s[-1] and s[0] in "'\"":
+                quoted.add(s[1:-1])
+                return s[1:-1]
+            return s
+
+        lhs = tuple(symbol(s) for s in symbols[:split])
+        alternative = []
+        for s in symbols[split + 1:]:
+            if s == "|":
+                raw_rules.append((lhs, tuple(alternative)))
+                alternative = []
+            elif s not in EPSILON_NAMES:
+                alternative.append(symbol(s))
+        raw_rules.append((lhs, tuple(alternative)))
+
+    if not raw_rules:
+        raise GrammarError("Грамматика не содержит правил")
+
+    nonterminals = {lhs[0] for lhs, _ in raw_rules if len(lhs) == 1 and lhs[0] not in quoted}
+    for lhs, rhs in raw_rules:
+        for s in lhs + rhs:
+            if s.startswith("<") and s.endswith(">") and s not in quoted:
+                nonterminals.add(s)
+    terminals = {s for lhs, rhs in raw_rules for s in lhs + rhs if s not in nonterminals}
+
+    start = raw_rules[0][0][0]
+    if start not in nonterminals:
+        raise GrammarError("Левая часть первого правила должна быть нетерминалом")
+    return Grammar(raw_rules, start, nonterminals, terminals)
+
+
+# Классификация по Хомскому: 0 — общего вида, 1 — контекстно-зависимая,
+# 2 — контекстно-свободная, 3 — регулярная
+def chomsky_type(grammar):
+    if not grammar.is_context_free():
+        start_in_rhs = any(grammar.start in rhs for _, rhs in grammar.rules)
+        for lhs, rhs in grammar.rules:
+            if len(rhs) < len(lhs) and not (lhs == (grammar.start,) and not rhs and not start_in_rhs):
+                return 0
+        return 1
+
+    def linear(rhs, right):
+        body = rhs[:-1] if right else rhs[1:]
+        return all(s in grammar.terminals for s in body)
+
+    if (all(linear(rhs, True) for _, rhs in grammar.rules)
+            or all(linear(rhs, False) for _, rhs in grammar.rules)):
+        return 3
+    return 2
+
+
+class Analysis:
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.nonterminals = grammar.nonterminals
+        # Расширенная грамматика: правило 0 — S' -> S
+        self.augmented_start = grammar.start + "'"
+        while self.augmented_start in grammar.nonterminals or self.augmented_start in grammar.terminals:
+            self.augmented_start += "'"
+        self.productions = [(self.augmented_start, (grammar.start,))]
+        self.productions += [(lhs[0], rhs) for lhs, rhs in grammar.rules]
+        self.by_lhs = {}
+        for index, (lhs, _) in enumerate(self.productions):
+            self.by_lhs.setdefault(lhs, []).append(index)
+
+        self.compute_first()
+        self.compute_follow()
+
+    def compute_first(self):
+        self.nullable = set()
+        self.first = {n: set() for n in self.by_lhs}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                first = self.first[lhs]
+                size = len(first)
+                all_nullable = True
+                for s in rhs:
+                    if s in self.first:
+                        first |= self.first[s]
+                        if s not in self.nullable:
+                            all_nullable = False
+                            break
+                    else:
+                        first.add(s)
+                        all_nullable = False
+                        break
+                if all_nullable and lhs not in self.nullable:
+                    self.nullable.add(lhs)
+                    changed = True
+                if len(first) != size:
+                    changed = True
+
+    # FIRST цепочки; второе значение — выводима ли цепочка в ε
+    def first_of(self, symbols):
+        result = set()
+        for s in symbols:
+            if s in self.first:
+                result |= self.first[s]
+                if s not in self.nullable:
+                    return result, False
+            else:
+                result.add(s)
+                return result, False
+        return result, True
+
+    def compute_follow(self):
+        self.follow = {n: set() for n in self.by_lhs}
+        self.follow[self.augmented_start].add(END)
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                for i, s in enumerate(rhs):
+                    if s not in self.follow:
+                        continue
+                    first, nullable = self.first_of(rhs[i + 1:])
+                    size = len(self.follow[s])
+                    self.follow[s] |= first
+                    if nullable:
+                        self.follow[s] |= self.follow[lhs]
+                    if len(self.follow[s]) != size:
+                        changed = True
+
+    def ll1_conflicts(self):
+        table = {}
+        conflicts = 0
+        for index, (lhs, rhs) in enumerate(self.productions[1:], 1):
+            first, nullable = self.first_of(rhs)
+            lookaheads = first | self.follow[lhs] if nullable else first
+            for a in lookaheads:
+                if table.setdefault((lhs, a), index) != index:
+                    conflicts += 1
+        return conflicts
+
+    # Канонический набор LR(1)-состояний; пункт — (правило, позиция точки, предпросмотр)
+    def lr1_states(self):
+        first_cache = {}
+
+        def closure(items):
+            result = set(items)
+            work = list(items)
+            while work:
+                prod, dot, la = work.pop()
+                rhs = self.productions[prod][1]
+                if dot >= len(rhs) or rhs[dot] not in self.by_lhs:
+                    continue
+                key = (prod, dot, la)
+                lookaheads = first_cache.get(key)
+                if lookaheads is None:
+                    first, nullable = self.first_of(rhs[dot + 1:])
+                    lookaheads = first | {la} if nullable else first
+                    first_cache[key] = lookaheads
+                for p in self.by_lhs[rhs[dot]]:
+                    for b in lookaheads:
+                        item = (p, 0, b)
+                        if item not in result:
+                            result.add(item)
+                            work.append(item)
+            return frozenset(result)
+
+        states = [closure({(0, 0, END)})]
+        index = {states[0]: 0}
+        transitions = []
+        i = 0
+        while i < len(states):
+            moves = {}
+            for prod, dot, la in states[i]:
+                rhs = self.productions[prod][1]
+                if dot < len(rhs):
+                    moves.setdefault(rhs[dot], set()).add((prod, dot + 1, la))
+            edges = {}
+            for symbol, kernel in moves.items():
+                target = closure(kernel)
+                if target not in index:
+                    index[target] = len(states)
+                    states.append(target)
+                edges[symbol] = index[target]
+            transitions.append(edges)
+            i += 1
+        return states, transitions
+
+    # LALR(1): слияние LR(1)-состояний с одинаковым ядром
+    def lalr_states(self, states, transitions):
+        core_index = {}
+        mapping = []
+        merged = []
+        for state in states:
+            core = frozenset((prod, dot) for prod, dot, _ in state)
+            if core not in core_index:
+                core_index[core] = len(merged)
+                merged.append(set())
+            mapping.append(core_index[core])
+            merged[core_index[core]] |= state
+        merged_transitions = [dict() for _ in merged]
+        for i, edges in enumerate(transitions):
+            for symbol, target in edges.items():
+                merged_transitions[mapping[i]][symbol] = mapping[target]
+        return merged, merged_transitions
+
+    def build_table(self, states, transitions):
+        action = []
+        goto = []
+        conflicts = 0
+        for i, state in enumerate(states):
+            row = {}
+            for prod, dot, la in state:
+                rhs = self.productions[prod][1]
+                if dot < len(rhs):
+                    if rhs[dot] in self.by_lhs:
+                        continue
+                    entry = (SHIFT, transitions[i][rhs[dot]])
+                    symbol = rhs[dot]
+                elif prod == 0:
+                    entry = (ACCEPT, 0)
+                    symbol = END
+                else:
+                    entry = (REDUCE, prod)
+                    symbol = la
+                if row.setdefault(symbol, entry) != entry:
+                    conflicts += 1
+            action.append(row)
+            goto.append({s: t for s, t in transitions[i].items() if s in self.by_lhs})
+        return action, goto, conflicts
+
+
+class GrammarTables:
+    def __init__(self):
+        self.grammar_hash = ""
+        self.chomsky_type = 0
+        self.rule_count = 0
+        self.terminals = set()
+        self.is_ll1 = False
+        self.is_lr1 = False
+        self.is_lalr1 = False
+        self.method = None  # "LALR(1)", "LR(1)" или None, если таблица с конфликтами
+        self.state_count = 0
+        self.action = []
+        self.goto = []
+        self.productions = []  # (левая часть, длина правой части)
+        self.build_time = 0.0
+
+
+def build_tables(text):
+    started = time.perf_counter()
+    grammar = parse_grammar(text)
+
+    tables = GrammarTables()
+    tables.grammar_hash = grammar_hash(text)
+    tables.chomsky_type = chomsky_type(grammar)
+    tables.rule_count = len(grammar.rules)
+    tables.terminals = set(grammar.terminals)
+
+    if grammar.is_context_free():
+        analysis = Analysis(grammar)
+        tables.is_ll1 = analysis.ll1_conflicts() == 0
+        states, transitions = analysis.lr1_states()
+        lr_action, lr_goto, lr_conflicts = analysis.build_table(states, transitions)
+        tables.is_lr1 = lr_conflicts == 0
+
+        merged, merged_transitions = analysis.lalr_states(states, transitions)
+        lalr_action, lalr_goto, lalr_conflicts = analysis.build_table(merged, merged_transitions)
+        tables.is_lalr1 = lalr_conflicts == 0
+
+        if tables.is_lalr1:
+            tables.method, tables.action, tables.goto = "LALR(1)", lalr_action, lalr_goto
+        elif tables.is_lr1:
+            tables.method, tables.action, tables.goto = "LR(1)", lr_action, lr_goto
+        tables.state_count = len(tables.action)
+        tables.productions = [(lhs, len(rhs)) for lhs, rhs in analysis.productions]
+
+    tables.build_time = time.perf_counter() - started
+    return tables
+
+
+def grammar_hash(text):
+    return hashlib.sha256(f"{CACHE_VERSION}:{text}".encode("utf-8")).hexdigest()
+
+
+# Таблицы берутся из кеша, если грамматика не менялась
+def load_grammar(path, cache_dir):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    cache_file = os.path.join(cache_dir, grammar_hash(text) + ".tables")
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Повреждённый или несовместимый кеш (pickle.load бросает что угодно): удаляется и строится заново
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+    tables = build_tables(text)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cache_file + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(tables, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_file)
+    return tables
+
+
+# Табличный LR-анализ; symbols — список пар (терминал, позиция для сообщения об ошибке).
+# Возвращает None при успехе или (позиция, ожидаемые терминалы) при ошибке.
+def parse(tables, symbols, end_position=None, budget=PASS_TIME_BUDGET):
+    action = tables.action
+    goto = tables.goto
+    productions = tables.productions
+    stack = [0]
+    i = 0
+    n = len(symbols)
+    deadline = time.perf_counter() + budget if budget else None
+    steps = 0
+
+    while True:
+        steps += 1
+        if deadline is not None and not steps & 0x3FF and time.perf_counter() > deadline:
+            raise ParseTimeout(symbols[i][1] if i < n else end_position)
+        state = stack[-1]
+        terminal, position = symbols[i] if i < n else (END, end_position)
+        entry = action[state].get(terminal)
+        if entry is None:
+            return position, sorted(action[state])
+        kind, value = entry
+        if kind == SHIFT:
+            stack.append(value)
+            i += 1
+        elif kind == REDUCE:
+            lhs, length = productions[value]
+            if length:
+                del stack[-length:]
+            stack.append(goto[stack[-1]][lhs])
+        else:
+            return None
+
+
+# Лексемы лексера -> терминалы грамматики: сама лексема, если она есть среди терминалов,
+# иначе обобщённое имя класса (id, num, str)
+def token_symbols(tables, tokens):
+    classes = {IDENTIFIER: "id", NUMBER: "num", STRING: "str"}
+    symbols = []
+    for token in tokens:
+        if token.kind == COMMENT:
+            continue
+        terminal = token.lexeme if token.lexeme in tables.terminals else classes.get(token.kind, token.lexeme)
+        symbols.append((terminal, (token.line, token.col)))
+    return symbols
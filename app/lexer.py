@@ -0,0 +1,215 @@
+import re
+import time
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+
+# Лексический анализатор (без зависимостей от Qt — используется и GUI, и LSP-сервером)
+
+KEYWORDS = ['var', 'const', 'if', 'else', 'while', 'for', 'return', 'true', 'false']
+
+# Ограничение времени на один проход анализа (секунды); по истечении результат частичный
+PASS_TIME_BUDGET = 2.0
+PARTIAL_MESSAGE = "Анализ прерван по времени: результат частичный"
+
+# Коды типов лексем
+KEYWORD = 1
+IDENTIFIER = 2
+NUMBER = 3
+STRING = 4
+COMMENT = 5
+OPERATOR = 6
+SEPARATOR = 7
+ERROR = 99
+
+KIND_NAMES = {
+    KEYWORD: "ключевое слово",
+    IDENTIFIER: "идентификатор",
+    NUMBER: "число",
+    STRING: "строка",
+    COMMENT: "комментарий",
+    OPERATOR: "оператор",
+    SEPARATOR: "разделитель",
+    ERROR: "недопустимый символ",
+}
+
+# line и col — с единицы, offset — смещение от начала текста
+Token = namedtuple("Token", ["kind", "lexeme", "line", "col", "offset"])
+Diagnostic = namedtuple("Diagnostic", ["line", "col", "length", "message"])
+Definition = namedtuple("Definition", ["name", "line", "col", "offset"])
+
+# Хранилище лексем на массивах: по одному числу на поле, лексема — срез исходного текста.
+# Итерация и индексация отдают Token, так что хранилище заменяет список лексем.
+class TokenStore:
+    def __init__(self, text):
+        self.text = text
+        self.kinds = array("b")
+        self.offsets = array("q")
+        self.lengths = array("l")
+        self.lines = array("l")
+        self.cols = array("l")
+
+    def append(self, kind, offset, length, line, col):
+        self.kinds.append(kind)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.lines.append(line)
+        self.cols.append(col)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def lexeme(self, i):
+        offset = self.offsets[i]
+        return self.text[offset:offset + self.lengths[i]]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.kinds)
+        return Token(self.kinds[i], self.lexeme(i), self.lines[i], self.cols[i], self.offsets[i])
+
+    def __iter__(self):
+        for i in range(len(self.kinds)):
+            yield self[i]
+
+    # Номер лексемы, содержащей смещение (или стоящей вплотную перед ним), либо -1
+    def index_at(self, offset):
+        i = bisect_right(self.offsets, offset) - 1
+        if i >= 0 and offset <= self.offsets[i] + self.lengths[i]:
+            return i
+        return -1
+
+
+# Строка до 256 символов между экранированиями разбирается одним совпадением (string);
+# длиннее — от открывающей кавычки (quote) окнами в _string_end с проверкой времени
+_TOKEN_RE = re.compile(r"""
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*)
+  | (?P<string>"[^"\\\n]{0,256}(?:\\.[^"\\\n]{0,256}){0,16}")
+  | (?P<quote>")
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_А-Яа-яЁё][A-Za-z0-9_А-Яа-яЁё]*)
+  | (?P<operator>==|!=|<=|>=|&&|\|\||[-+*/%=<>!])
+  | (?P<separator>[;,(){}\[\]])
+  | (?P<error>.)
+""", re.VERBOSE)
+
+# Тело строкового литерала: до кавычки, перевода строки или обратной косой черты перед ним
+_STRING_BODY_RE = re.compile(r'[^"\\\n]*(?:\\.[^"\\\n]*)*')
+STRING_WINDOW = 1 << 16  # символов тела строки на один вызов регулярного выражения
+
+
+# Конец тела строки, начиная с pos (после открывающей кавычки), или None по истечении времени.
+# Тело разбирается окнами: одно совпадение на строке в сотни мегабайт не прерывается проверкой времени
+def _string_end(text, pos, deadline):
+    length = len(text)
+    while True:
+        window = min(pos + STRING_WINDOW, length)
+        end = _STRING_BODY_RE.match(text, pos, window).end()
+        if end == length:
+            return end
+        # Окно разрезало экранирование: «\» на последней позиции окна разбирается в следующем
+        split_escape = window < length and end == window - 1 and text[end] == "\\"
+        if end < window and not split_escape:
+            return end
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        pos = end
+
+
+def tokenize(text, budget=PASS_TIME_BUDGET):
+    tokens = TokenStore(text)
+    errors = []
+    line = 1
+    line_start = 0
+    deadline = time.perf_counter() + budget if budget else None
+    count = 0
+    pos = 0
+
+    # Длинная строка или строка с экранированием разбирается отдельно (_string_end),
+    # после неё поиск лексем продолжается с конца строки
+    while pos is not None:
+        resume = None
+        for match in _TOKEN_RE.finditer(text, pos):
+            group = match.lastgroup
+            start = match.start()
+            # Время проверяется раз в 1024 совпадения
+            if deadline is not None and not count & 0x3FF and time.perf_counter() > deadline:
+                errors.append(Diagnostic(line, start - line_start + 1, 0, PARTIAL_MESSAGE))
+                return tokens, errors
+            count += 1
+            if group == "newline":
+                line += 1
+                line_start = start + 1
+                continue
+            if group == "space":
+                continue
+
+            end = match.end()
+            col = start - line_start + 1
+
+            if group == "word":
+                kind = KEYWORD if match.group() in KEYWORDS else IDENTIFIER
+            elif group == "string":
+                kind = STRING
+            elif group == "quote":
+                kind = STRING
+                end = _string_end(text, end, deadline)
+                if end is None:
+                    errors.append(Diagnostic(line, col, 0, PARTIAL_MESSAGE))
+                    return tokens, errors
+                if end < len(text) and text[end] == '"':
+                    end += 1
+                else:
+                    # Незакрытая строка продолжается до конца строки текста
+                    newline = text.find("\n", end)
+                    end = newline if newline != -1 else len(text)
+                    errors.append(Diagnostic(line, col, end - start, "Незакрытая строка"))
+                resume = end
+            elif group == "number":
+                kind = NUMBER
+            elif group == "comment":
+                kind = COMMENT
+            elif group == "operator":
+                kind = OPERATOR
+            elif group == "separator":
+                kind = SEPARATOR
+            else:
+                kind = ERROR
+                errors.append(Diagnostic(line, col, 1, "Недопустимый символ"))
+
+            tokens.append(kind, start, end - start, line, col)
+            if resume is not None:
+                break
+        pos = resume
+
+    return tokens, errors
+
+
+# Объявления вида "var x" / "const x"
+def find_definitions(tokens):
+    definitions = {}
+    kinds = tokens.kinds
+    previous = -1
+    for i, kind in enumerate(kinds):
+        if kind == COMMENT:
+            continue
+        if (kind == IDENTIFIER and previous >= 0 and kinds[previous] == KEYWORD
+                and tokens.lexeme(previous) in ("var", "const")):
+            name = tokens.lexeme(i)
+            if name not in definitions:
+                definitions[name] = Definition(name, tokens.lines[i], tokens.cols[i], tokens.offsets[i])
+        previous = i
+    return definitions
+
+
+def token_at(tokens, offset):
+    i = tokens.index_at(offset)
+    return tokens[i] if i >= 0 else None
+
+
+def analyze(text, budget=PASS_TIME_BUDGET):
+    tokens, errors = tokenize(text, budget)
+    return tokens, errors, find_definitions(tokens)
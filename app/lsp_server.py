@@ -0,0 +1,317 @@
+import sys
+import re
+import json
+import threading
+from bisect import bisect_left, bisect_right
+
+from lexer import (
+    analyze,
+    token_at,
+    KEYWORD,
+    IDENTIFIER,
+    NUMBER,
+    STRING,
+    COMMENT,
+    OPERATOR,
+)
+
+
+# LSP-сервер поверх stdio: те же диагностики, что и в окне Compiler, но без Qt.
+# Позиции: UTF-32 (символы Python), если клиент его предлагает, иначе UTF-16 по умолчанию LSP.
+
+DIAGNOSTICS_DELAY = 0.3  # секунды без правок перед публикацией диагностик
+
+TOKEN_TYPES = ["keyword", "variable", "number", "string", "comment", "operator"]
+TOKEN_TYPE_INDEX = {
+    KEYWORD: 0,
+    IDENTIFIER: 1,
+    NUMBER: 2,
+    STRING: 3,
+    COMMENT: 4,
+    OPERATOR: 5,
+}
+
+# Символы вне BMP занимают в UTF-16 две позиции
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+
+# Начала строк после каждого перевода строки в text; base — смещение text в документе
+def line_breaks(text, base=0):
+    starts = []
+    pos = text.find("\n")
+    while pos != -1:
+        starts.append(base + pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+
+class Document:
+    def __init__(self, text, version=0, utf16=True):
+        self.version = version
+        self.utf16 = utf16
+        self.set_text(text)
+
+    def set_text(self, text):
+        self.text = text
+        self.line_starts = [0] + line_breaks(text)
+        self._analysis = None
+        self._astral = None
+
+    # Строка -> столбцы (с нуля) символов вне BMP; строится один раз на версию текста
+    def astral_columns(self):
+        if self._astral is None:
+            self._astral = {}
+            # isascii() не просматривает строку: в ASCII-тексте нечего искать
+            if self.utf16 and not self.text.isascii():
+                for match in _ASTRAL_RE.finditer(self.text):
+                    line = bisect_right(self.line_starts, match.start()) - 1
+                    self._astral.setdefault(line, []).append(match.start() - self.line_starts[line])
+        return self._astral
+
+    # Позиция LSP -> смещение в тексте
+    def offset(self, position):
+        line = position["line"]
+        if line >= len(self.line_starts):
+            return len(self.text)
+        start = self.line_starts[line]
+        end = self.line_starts[line + 1] - 1 if line + 1 < len(self.line_starts) else len(self.text)
+        character = position["character"]
+        for col in self.astral_columns().get(line, ()):
+            if col >= character:
+                break
+            character -= 1
+        return min(start + character, end)
+
+    # Столбец в символах Python (с нуля) -> столбец LSP
+    def lsp_character(self, line, col):
+        columns = self.astral_columns().get(line)
+        return col + bisect_left(columns, col) if columns else col
+
+    # Диапазон LSP для line/col лексера (с единицы) и длины в символах
+    def lsp_range(self, line, col, length):
+        start = self.lsp_character(line - 1, col - 1)
+        end = self.lsp_character(line - 1, col - 1 + length)
+        return {"start": {"line": line - 1, "character": start}, "end": {"line": line - 1, "character": end}}
+
+    def apply_change(self, change):
+        if "range" not in change:
+            self.set_text(change["text"])
+            return
+        start = self.offset(change["range"]["start"])
+        end = self.offset(change["range"]["end"])
+        text = change["text"]
+        self.text = self.text[:start] + text + self.text[end:]
+        # Индекс строк не строится заново: заменяются начала строк внутри правки, следующие сдвигаются
+        starts = self.line_starts
+        first = bisect_right(starts, start)
+        last = bisect_right(starts, end)
+        delta = len(text) - (end - start)
+        tail = starts[last:]
+        starts[first:] = line_breaks(text, start) + ([s + delta for s in tail] if delta else tail)
+        self._analysis = None
+        self._astral = None
+
+    # Анализ кешируется до следующей правки
+    def analysis(self):
+        if self._analysis is None:
+            self._analysis = analyze(self.text)
+        return self._analysis
+
+
+class LanguageServer:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.write_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.documents = {}
+        self.timers = {}
+        self.running = True
+        self.shutdown_requested = False
+        self.position_encoding = "utf-16"
+
+    # Транспорт: заголовок Content-Length + JSON
+    def read_message(self):
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode("utf-8"))
+
+    def send(self, message):
+        message["jsonrpc"] = "2.0"
+        body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        with self.write_lock:
+            self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+            self.writer.write(body)
+            self.writer.flush()
+
+    def serve(self):
+        while self.running:
+            message = self.read_message()
+            if message is None:
+                break
+            self.handle(message)
+        for timer in self.timers.values():
+            timer.cancel()
+
+    def handle(self, message):
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + method.replace("/", "_").replace("$", "_"), None) if method else None
+
+        if "id" not in message:
+            if handler is None:
+                return
+            # На уведомление ответа нет: ошибка уходит в stderr, сервер продолжает работу
+            try:
+                with self.state_lock:
+                    handler(params)
+            except Exception as e:
+                print(f"{method}: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+
+        if handler is None:
+            self.send({"id": message["id"], "error": {"code": -32601, "message": f"Method not found: {method}"}})
+            return
+        try:
+            with self.state_lock:
+                result = handler(params)
+        except Exception as e:
+            print(f"{method}: {type(e).__name__}: {e}", file=sys.stderr)
+            self.send({"id": message["id"], "error": {"code": -32603, "message": str(e)}})
+            return
+        self.send({"id": message["id"], "result": result})
+
+    # Жизненный цикл
+    def on_initialize(self, params):
+        encodings = (params.get("capabilities") or {}).get("general", {}).get("positionEncodings") or []
+        self.position_encoding = "utf-32" if "utf-32" in encodings else "utf-16"
+        return {
+            "capabilities": {
+                "positionEncoding": self.position_encoding,
+                "textDocumentSync": {"openClose": True, "change": 2},
+                "definitionProvider": True,
+                "semanticTokensProvider": {
+                    "legend": {"tokenTypes": TOKEN_TYPES, "tokenModifiers": []},
+                    "full": True,
+                },
+            },
+            "serverInfo": {"name": "compiler-lsp"},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def on_exit(self, params):
+        self.running = False
+
+    # Синхронизация документов
+    def on_textDocument_didOpen(self, params):
+        item = params["textDocument"]
+        self.documents[item["uri"]] = Document(item["text"], item.get("version", 0),
+                                               self.position_encoding == "utf-16")
+        self.schedule_diagnostics(item["uri"])
+
+    def on_textDocument_didChange(self, params):
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            document.apply_change(change)
+        document.version = params["textDocument"].get("version", document.version)
+        self.schedule_diagnostics(uri)
+
+    def on_textDocument_didClose(self, params):
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        timer = self.timers.pop(uri, None)
+        if timer:
+            timer.cancel()
+        self.send({"method": "textDocument/publishDiagnostics", "params": {"uri": uri, "diagnostics": []}})
+
+    # Диагностики публикуются после паузы в правках
+    def schedule_diagnostics(self, uri):
+        timer = self.timers.get(uri)
+        if timer:
+            timer.cancel()
+        timer = threading.Timer(DIAGNOSTICS_DELAY, self.publish_diagnostics, (uri,))
+        timer.daemon = True
+        self.timers[uri] = timer
+        timer.start()
+
+    def publish_diagnostics(self, uri):
+        with self.state_lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            version = document.version
+            _, errors, _ = document.analysis()
+            diagnostics = [{
+                "range": document.lsp_range(error.line, error.col, error.length),
+                "severity": 1,
+                "source": "compiler",
+                "message": error.message,
+            } for error in errors]
+        self.send({
+            "method": "textDocument/publishDiagnostics",
+            "params": {"uri": uri, "version": version, "diagnostics": diagnostics},
+        })
+
+    # Семантические токены из вывода лексера (относительное кодирование LSP)
+    def on_textDocument_semanticTokens_full(self, params):
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return {"data": []}
+        tokens, _, _ = document.analysis()
+        data = []
+        prev_line = 0
+        prev_char = 0
+        for token in tokens:
+            token_type = TOKEN_TYPE_INDEX.get(token.kind)
+            if token_type is None:
+                continue
+            line = token.line - 1
+            char = document.lsp_character(line, token.col - 1)
+            length = document.lsp_character(line, token.col - 1 + len(token.lexeme)) - char
+            delta_char = char - prev_char if line == prev_line else char
+            data.extend([line - prev_line, delta_char, length, token_type, 0])
+            prev_line = line
+            prev_char = char
+        return {"data": data}
+
+    def on_textDocument_definition(self, params):
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None:
+            return None
+        tokens, _, definitions = document.analysis()
+        token = token_at(tokens, document.offset(params["position"]))
+        if token is None or token.kind != IDENTIFIER or token.lexeme not in definitions:
+            return None
+        definition = definitions[token.lexeme]
+        return {"uri": uri, "range": document.lsp_range(definition.line, definition.col, len(definition.name))}
+
+
+def main():
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+    server.serve()
+    sys.exit(0 if server.shutdown_requested else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+
+from PyQt6.QtCore import QDataStream, QFile, QIODevice, QSaveFile, QStandardPaths
+
+
+# Снимок рабочей сессии в компактном двоичном виде (QDataStream)
+
+SESSION_MAGIC = 0x43534553  # "CSES"
+SESSION_VERSION = 4
+
+
+class Session:
+    def __init__(self):
+        self.language = "ru"
+        self.current_file = ""
+        self.cursor_position = 0
+        self.scroll_value = 0
+        self.splitter_sizes = []
+        self.geometry = b""
+        self.grammar_file = ""
+        # Результаты последнего анализа и хеш текста, к которому они относятся
+        self.analysis_hash = ""
+        self.errors = []  # (строка, позиция, сообщение)
+        # Лимиты истории отмены (0 — без ограничения)
+        self.undo_max_steps = 0
+        self.undo_max_megabytes = 64
+        # Папка, открытая как проект («Открыть папку проекта»)
+        self.project_dir = ""
+
+
+def session_path():
+    directory = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, "session.bin")
+
+
+def write_session(session, path=None):
+    f = QSaveFile(path or session_path())
+    if not f.open(QIODevice.OpenModeFlag.WriteOnly):
+        return False
+
+    stream = QDataStream(f)
+    stream.writeUInt32(SESSION_MAGIC)
+    stream.writeUInt16(SESSION_VERSION)
+    stream.writeQString(session.language)
+    stream.writeQString(session.current_file)
+    stream.writeInt64(session.cursor_position)
+    stream.writeInt32(session.scroll_value)
+    stream.writeUInt16(len(session.splitter_sizes))
+    for size in session.splitter_sizes:
+        stream.writeInt32(size)
+    stream.writeBytes(session.geometry)
+    stream.writeQString(session.grammar_file)
+    stream.writeQString(session.analysis_hash)
+    stream.writeUInt32(len(session.errors))
+    for line, col, message in session.errors:
+        stream.writeUInt32(line)
+        stream.writeUInt32(col)
+        stream.writeQString(message)
+    stream.writeUInt32(session.undo_max_steps)
+    stream.writeUInt32(session.undo_max_megabytes)
+    stream.writeQString(session.project_dir)
+
+    return f.commit()
+
+
+def read_session(path=None):
+    f = QFile(path or session_path())
+    if not f.open(QIODevice.OpenModeFlag.ReadOnly):
+        return None
+
+    stream = QDataStream(f)
+    if stream.readUInt32() != SESSION_MAGIC or stream.readUInt16() != SESSION_VERSION:
+        return None
+
+    session = Session()
+    session.language = stream.readQString()
+    session.current_file = stream.readQString()
+    session.cursor_position = stream.readInt64()
+    session.scroll_value = stream.readInt32()
+    session.splitter_sizes = [stream.readInt32() for _ in range(stream.readUInt16())]
+    session.geometry = stream.readBytes()
+    session.grammar_file = stream.readQString()
+    session.analysis_hash = stream.readQString()
+    session.errors = [(stream.readUInt32(), stream.readUInt32(), stream.readQString())
+                      for _ in range(stream.readUInt32())]
+    session.undo_max_steps = stream.readUInt32()
+    session.undo_max_megabytes = stream.readUInt32()
+    session.project_dir = stream.readQString()
+
+    if stream.status() != QDataStream.Status.Ok:
+        return None
+    return session
@@ -0,0 +1,203 @@
+from array import array
+from bisect import bisect_right
+
+
+CHUNK_SIZE = 1 << 20
+MERGE_LIMIT = 1 << 12  # соседние куски короче в сумме склеиваются в одну строку
+PIECE_LIMIT = 1 << 14  # при большем числе кусков таблица собирается в одну строку
+
+# selectedText() отдаёт разделители абзацев и неразрывный пробел иначе, чем toPlainText()
+_PLAIN_TEXT = str.maketrans({"\u2029": "\n", "\u2028": "\n", "\ufdd0": "\n", "\ufdd1": "\n", "\xa0": " "})
+
+
+def plain_text(text):
+    return text.translate(_PLAIN_TEXT)
+
+
+# Подсчёт слов по кускам: слово на границе двух кусков считается один раз
+def count_words(chunks):
+    count = 0
+    joined = False  # предыдущий кусок закончился не пробельным символом
+    for chunk in chunks:
+        if not chunk:
+            continue
+        count += len(chunk.split())
+        if joined and not chunk[0].isspace():
+            count -= 1
+        joined = not chunk[-1].isspace()
+    return count
+
+
+# Куски (строка, начало, конец) по CHUNK_SIZE символов: срезы без копирования всего текста
+def piece_chunks(pieces, size=CHUNK_SIZE):
+    for text, begin, end in pieces:
+        if begin == 0 and end == len(text) and end <= size:
+            yield text
+            continue
+        for start in range(begin, end, size):
+            yield text[start:min(start + size, end)]
+
+
+# Таблица кусков: текст документа — последовательность срезов неизменяемых строк.
+# Загруженный текст не копируется, правка из contentsChange разрезает кусок и вставляет новый;
+# длина, число строк и слов пересчитываются только по изменённому участку.
+class PieceTable:
+    def __init__(self, text=""):
+        self.reset(text)
+
+    def reset(self, text):
+        self.pieces = [(text, 0, len(text))] if text else []
+        self.length = len(text)
+        self.newlines = text.count("\n")
+        self.words = None  # считаются при первом снимке, дальше — по правкам
+
+    # Номер куска, содержащего смещение, и начало этого куска в тексте
+    def find(self, offset):
+        start = 0
+        for i, (_, begin, end) in enumerate(self.pieces):
+            if offset < start + end - begin:
+                return i, start
+            start += end - begin
+        return len(self.pieces), start
+
+    # Разрезает кусок на смещении; возвращает номер куска, который с него начинается
+    def split(self, offset):
+        i, start = self.find(offset)
+        if i < len(self.pieces) and offset > start:
+            text, begin, end = self.pieces[i]
+            cut = begin + offset - start
+            self.pieces[i:i + 1] = [(text, begin, cut), (text, cut, end)]
+            i += 1
+        return i
+
+    def slice(self, start, stop):
+        parts = []
+        i, piece_start = self.find(start)
+        while start < stop and i < len(self.pieces):
+            text, begin, end = self.pieces[i]
+            parts.append(text[begin + start - piece_start:min(end, begin + stop - piece_start)])
+            piece_start += end - begin
+            start = piece_start
+            i += 1
+        return "".join(parts)
+
+    def replace(self, position, removed, text):
+        old = self.slice(position, position + removed)
+        if self.words is not None:
+            # Слова считаются с одним символом контекста с каждой стороны:
+            # правка может склеить или разорвать соседние слова
+            left = self.slice(position - 1, position) if position else ""
+            right = self.slice(position + removed, position + removed + 1)
+            self.words += len((left + text + right).split()) - len((left + old + right).split())
+        self.newlines += text.count("\n") - old.count("\n")
+        self.length += len(text) - removed
+
+        i = self.split(position)
+        j = self.split(position + removed)
+        self.pieces[i:j] = [(text, 0, len(text))] if text else []
+        if text:
+            self.merge(i)
+        self.merge(i - 1)
+        if len(self.pieces) > PIECE_LIMIT:
+            joined = "".join(piece_chunks(self.pieces))
+            self.pieces = [(joined, 0, len(joined))]
+
+    # Склеивает кусок i со следующим, если оба короткие: набор подряд не плодит куски
+    def merge(self, i):
+        pieces = self.pieces
+        if i < 0 or i + 1 >= len(pieces):
+            return False
+        first, second = pieces[i], pieces[i + 1]
+        if first[2] - first[1] + second[2] - second[1] > MERGE_LIMIT:
+            return False
+        text = first[0][first[1]:first[2]] + second[0][second[1]:second[2]]
+        pieces[i:i + 2] = [(text, 0, len(text))]
+        return True
+
+    def snapshot(self, version):
+        if self.words is None:
+            self.words = count_words(piece_chunks(self.pieces))
+        return DocumentSnapshot(tuple(self.pieces), version, self.length, self.newlines, self.words)
+
+
+# Неизменяемый снимок текста документа с номером версии: кортеж кусков неизменяемых строк,
+# поэтому снимок создаётся без копирования текста и отдаётся фоновым потокам как есть.
+# Сплошная строка собирается только по запросу text, индекс начал строк — по запросу позиций.
+class DocumentSnapshot:
+    def __init__(self, pieces, version, length, newlines, words):
+        self.pieces = pieces
+        self.version = version
+        self.length = length
+        self.newlines = newlines
+        self.words = words
+        self._text = None
+        self._line_starts = None
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def text(self):
+        if self._text is None:
+            if len(self.pieces) == 1 and self.pieces[0][1] == 0 and self.pieces[0][2] == len(self.pieces[0][0]):
+                self._text = self.pieces[0][0]
+            else:
+                self._text = "".join(text[begin:end] for text, begin, end in self.pieces)
+        return self._text
+
+    def is_blank(self):
+        return all(chunk.isspace() for chunk in self.chunks())
+
+    def word_count(self):
+        return self.words
+
+    def line_count(self):
+        return self.newlines + 1
+
+    # Текст кусками — например, для записи в файл без сборки всей строки
+    def chunks(self, size=CHUNK_SIZE):
+        return piece_chunks(self.pieces, size)
+
+    # Строки с номерами first..last-1 (с нуля) по кускам, без сборки всего текста
+    def lines(self, first=0, last=None):
+        number = 0
+        parts = []
+        for chunk in self.chunks():
+            start = 0
+            end = chunk.find("\n")
+            while end != -1:
+                if last is not None and number >= last:
+                    return
+                if number >= first:
+                    parts.append(chunk[start:end])
+                    yield "".join(parts)
+                parts = []
+                number += 1
+                start = end + 1
+                end = chunk.find("\n", start)
+            if number >= first:
+                parts.append(chunk[start:])
+        if number >= first and (last is None or number < last):
+            yield "".join(parts)
+
+    @property
+    def line_starts(self):
+        if self._line_starts is None:
+            starts = array("q", [0])
+            offset = 0
+            for chunk in self.chunks():
+                pos = chunk.find("\n")
+                while pos != -1:
+                    starts.append(offset + pos + 1)
+                    pos = chunk.find("\n", pos + 1)
+                offset += len(chunk)
+            self._line_starts = starts
+        return self._line_starts
+
+    # Смещение -> (строка, столбец), оба с единицы
+    def position(self, offset):
+        number = bisect_right(self.line_starts, offset) - 1
+        return number + 1, offset - self.line_starts[number] + 1
+
+    def offset(self, line, col):
+        return self.line_starts[line - 1] + col - 1
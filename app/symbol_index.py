@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import hashlib
+
+from lexer import tokenize, KEYWORD, IDENTIFIER, COMMENT
+
+
+# Постоянный индекс символов проекта (SQLite в каталоге кеша проекта):
+# объявления и использования по файлам, обновление по хешу содержимого.
+
+CACHE_DIR_NAME = ".compiler-cache"
+INDEX_VERSION = 2
+FUZZY_SCAN_LIMIT = 20_000  # сколько имён просматривает поиск по подпоследовательности
+
+DECLARATION = 0
+REFERENCE = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_kind_name ON symbols (kind, name);
+CREATE INDEX IF NOT EXISTS symbols_by_file ON symbols (file_id);
+-- Различные имена объявлений: нечёткий поиск просматривает только их, а не все символы
+CREATE TABLE IF NOT EXISTS declared_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    count INTEGER NOT NULL
+);
+"""
+
+# Триграммный индекс имён для поиска подстроки (FTS5, SQLite 3.34+)
+_TRIGRAM_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS declared_trigrams USING fts5(
+    name, content='declared_names', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS declared_names_insert AFTER INSERT ON declared_names BEGIN
+    INSERT INTO declared_trigrams (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS declared_names_delete AFTER DELETE ON declared_names BEGIN
+    INSERT INTO declared_trigrams (declared_trigrams, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+
+# Объявления — идентификаторы после var/const, остальные идентификаторы — использования
+def collect_symbols(tokens):
+    symbols = []
+    kinds = tokens.kinds
+    previous = -1
+    for i, kind in enumerate(kinds):
+        if kind == COMMENT:
+            continue
+        if kind == IDENTIFIER:
+            declared = (previous >= 0 and kinds[previous] == KEYWORD
+                        and tokens.lexeme(previous) in ("var", "const"))
+            symbols.append((tokens.lexeme(i), DECLARATION if declared else REFERENCE,
+                            tokens.lines[i], tokens.cols[i]))
+        previous = i
+    return symbols
+
+
+class SymbolIndex:
+    def __init__(self, project_dir, extensions=(".txt",), cache_dir=None):
+        self.project_dir = os.path.abspath(project_dir)
+        self.extensions = tuple(extensions)
+        cache_dir = cache_dir or os.path.join(self.project_dir, CACHE_DIR_NAME)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(cache_dir, "symbols.sqlite3"))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS symbols; "
+                                  "DROP TABLE IF EXISTS declared_trigrams; DROP TABLE IF EXISTS declared_names;")
+            self.db.execute(f"PRAGMA user_version={INDEX_VERSION}")
+        self.db.executescript(_SCHEMA)
+        try:
+            self.db.executescript(_TRIGRAM_SCHEMA)
+            self.trigrams = True
+        except sqlite3.OperationalError:
+            # Сборка SQLite без FTS5 или триграмм: подстроки ищутся только среди кандидатов
+            self.trigrams = False
+
+    def close(self):
+        self.db.close()
+
+    def relative(self, path):
+        return os.path.relpath(os.path.abspath(path), self.project_dir)
+
+    # Обновление одного файла; text — содержимое из редактора, если оно уже в памяти.
+    # Возвращает True, если символы файла пересчитаны.
+    def update_file(self, path, text=None):
+        rel = self.relative(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.remove_file(path)
+            return False
+
+        row = self.db.execute("SELECT id, mtime_ns, size, hash FROM files WHERE path = ?", (rel,)).fetchone()
+        if text is None and row is not None and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return False
+
+        if text is None:
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            except OSError:
+                return False
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+        with self.db:
+            if row is not None and row[3] == digest:
+                self.db.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                                (st.st_mtime_ns, st.st_size, row[0]))
+                return False
+            if row is None:
+                file_id = self.db.execute(
+                    "INSERT INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                    (rel, st.st_mtime_ns, st.st_size, digest)).lastrowid
+                old_names = set()
+            else:
+                file_id = row[0]
+                self.db.execute("UPDATE files SET mtime_ns = ?, size = ?, hash = ? WHERE id = ?",
+                                (st.st_mtime_ns, st.st_size, digest, file_id))
+                old_names = self.delete_symbols(file_id)
+
+            # Без ограничения времени: иначе большой файл остался бы проиндексирован частично
+            tokens, _ = tokenize(text, budget=0)
+            symbols = collect_symbols(tokens)
+            self.db.executemany(
+                "INSERT INTO symbols (file_id, name, kind, line, col) VALUES (?, ?, ?, ?, ?)",
+                ((file_id, name, kind, line, col) for name, kind, line, col in symbols))
+            self.refresh_declared_names(old_names | {name for name, kind, _, _ in symbols if kind == DECLARATION})
+        return True
+
+    def delete_symbols(self, file_id):
+        names = {name for (name,) in self.db.execute(
+            "SELECT name FROM symbols WHERE file_id = ? AND kind = ?", (file_id, DECLARATION))}
+        self.db.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+        return names
+
+    # Пересчёт счётчиков только для имён, затронутых изменением файла
+    def refresh_declared_names(self, names):
+        for name in names:
+            count = self.db.execute("SELECT COUNT(*) FROM symbols WHERE kind = ? AND name = ?",
+                                    (DECLARATION, name)).fetchone()[0]
+            if count:
+                # Без REPLACE: удаление внутри REPLACE не запускает триггер триграммного индекса
+                self.db.execute("INSERT INTO declared_names (name, count) VALUES (?, ?) "
+                                "ON CONFLICT (name) DO UPDATE SET count = excluded.count", (name, count))
+            else:
+                self.db.execute("DELETE FROM declared_names WHERE name = ?", (name,))
+
+    def remove_file(self, path):
+        rel = self.relative(path)
+        with self.db:
+            row = self.db.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+            if row is not None:
+                self.refresh_declared_names(self.delete_symbols(row[0]))
+                self.db.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    # Полный проход по проекту: пересчитываются только изменённые файлы
+    def update_tree(self):
+        seen = set()
+        changed = 0
+        for dirpath, dirnames, filenames in os.walk(self.project_dir):
+            dirnames[:] = [d for d in dirnames if d != CACHE_DIR_NAME]
+            for name in filenames:
+                if name.lower().endswith(self.extensions):
+                    path = os.path.join(dirpath, name)
+                    seen.add(self.relative(path))
+                    if self.update_file(path):
+                        changed += 1
+
+        stale = [path for (path,) in self.db.execute("SELECT path FROM files") if path not in seen]
+        for rel in stale:
+            self.remove_file(os.path.join(self.project_dir, rel))
+        return changed
+
+    def _locations(self, name, kind):
+        rows = self.db.execute(
+            "SELECT files.path, symbols.line, symbols.col FROM symbols "
+            "JOIN files ON files.id = symbols.file_id "
+            "WHERE symbols.kind = ? AND symbols.name = ? ORDER BY files.path, symbols.line, symbols.col",
+            (kind, name))
+        return [(os.path.join(self.project_dir, path), line, col) for path, line, col in rows]
+
+    def definitions(self, name):
+        return self._locations(name, DECLARATION)
+
+    def references(self, name):
+        return self._locations(name, REFERENCE)
+
+    # Нечёткий поиск объявлений, каждый этап — по индексу или по ограниченному набору имён:
+    # префикс (B-дерево), подстрока (триграммы), подпоследовательность символов запроса
+    # среди не более FUZZY_SCAN_LIMIT имён на ту же первую букву
+    def search(self, query, limit=50):
+        query = query.strip()
+        if not query:
+            return []
+        names = [name for (name,) in self.db.execute(
+            "SELECT name FROM declared_names WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (query, query + "\U0010ffff", limit))]
+        found = set(names)
+
+        if len(names) < limit and self.trigrams and len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            substring = [name for (name,) in self.db.execute(
+                "SELECT name FROM declared_trigrams WHERE declared_trigrams MATCH ? LIMIT ?",
+                (phrase, limit * 2)) if name not in found]
+            names += sorted(substring, key=len)[:limit - len(names)]
+            found.update(names)
+
+        if len(names) < limit:
+            pattern = "%".join("\\" + c if c in "\\%_" else c for c in query) + "%"
+            fuzzy = [name for (name,) in self.db.execute(
+                "SELECT name FROM (SELECT name FROM declared_names WHERE name >= ? AND name < ? LIMIT ?) "
+                "WHERE name LIKE ? ESCAPE '\\' LIMIT ?",
+                (query[0], query[0] + "\U0010ffff", FUZZY_SCAN_LIMIT, pattern, limit * 2))
+                if name not in found]
+            names += sorted(fuzzy, key=len)[:limit - len(names)]
+
+        results = []
+        for name in names:
+            results.extend((name,) + location for location in self.definitions(name))
+        return results[:limit]
@@ -59,6 +59,76 @@ class Translator:
                 "Ожидался символ ';' после выражения": "Ожидался символ ';' после выражения",
                 "Неизвестный идентификатор 'addd'": "Неизвестный идентификатор 'addd'",
                 "Несоответствие типов": "Несоответствие типов",
+                "Лексем": "Лексем",
+                "Объявлений": "Объявлений",
+                "Ошибок": "Ошибок",
+                "Недопустимый символ": "Недопустимый символ",
+                "Незакрытая строка": "Незакрытая строка",
+                "Наблюдение за папкой": "Наблюдение за папкой",
+                "Наблюдение:": "Наблюдение:",
+                "Наблюдение остановлено": "Наблюдение остановлено",
+                "Отмена:": "Отмена:",
+                "КБ": "КБ",
+                "История отмены очищена: превышен лимит": "История отмены очищена: превышен лимит",
+                "Лимит истории отмены": "Лимит истории отмены",
+                "Шагов отмены:": "Шагов отмены:",
+                "Памяти, МБ:": "Памяти, МБ:",
+                "без ограничения": "без ограничения",
+                "Синтаксическая ошибка": "Синтаксическая ошибка",
+                "Синтаксический анализ": "Синтаксический анализ",
+                "Не удалось загрузить грамматику": "Не удалось загрузить грамматику",
+                "Грамматика:": "Грамматика:",
+                "Правил": "Правил",
+                "Терминалов": "Терминалов",
+                "Состояний": "Состояний",
+                "Время построения таблиц": "Время построения таблиц",
+                "тип 0 — грамматика общего вида": "тип 0 — грамматика общего вида",
+                "тип 1 — контекстно-зависимая": "тип 1 — контекстно-зависимая",
+                "тип 2 — контекстно-свободная": "тип 2 — контекстно-свободная",
+                "тип 3 — регулярная": "тип 3 — регулярная",
+                "да": "да",
+                "нет": "нет",
+                "мс": "мс",
+                "Режим длинных строк: строки обрезаны, только чтение": "Режим длинных строк: строки обрезаны, только чтение",
+                "Синтаксический анализ пропущен: лексический анализ неполный": "Синтаксический анализ пропущен: лексический анализ неполный",
+                "Полный список лексем строится в фоне": "Полный список лексем строится в фоне",
+                "Лексем (полный список)": "Лексем (полный список)",
+                "Перейти к объявлению": "Перейти к объявлению",
+                "Найти использования": "Найти использования",
+                "Перейти к символу": "Перейти к символу",
+                "Объявление не найдено:": "Объявление не найдено:",
+                "Использования": "Использования",
+                "Откройте папку проекта": "Откройте папку проекта",
+                "Открыть папку проекта": "Открыть папку проекта",
+                "Папка проекта": "Папка проекта",
+                "Индексация проекта...": "Индексация проекта...",
+                "Индекс проекта готов": "Индекс проекта готов",
+                "Не удалось построить индекс проекта": "Не удалось построить индекс проекта",
+                "Лексемы": "Лексемы",
+                "Все лексемы": "Все лексемы",
+                "Код": "Код",
+                "Тип": "Тип",
+                "Лексема": "Лексема",
+                "ключевое слово": "ключевое слово",
+                "идентификатор": "идентификатор",
+                "число": "число",
+                "строка": "строка",
+                "комментарий": "комментарий",
+                "оператор": "оператор",
+                "разделитель": "разделитель",
+                "недопустимый символ": "недопустимый символ",
+                "Анализ прерван по времени: результат частичный": "Анализ прерван по времени: результат частичный",
+                "По Хомскому": "По Хомскому",
+                "Восходящий табличный анализ": "Восходящий табличный анализ",
+                "Для грамматики нельзя построить бесконфликтную таблицу LR(1)": "Для грамматики нельзя построить бесконфликтную таблицу LR(1)",
+                "Загрузка грамматики из файла (.txt, .bnf, .g).": "Загрузка грамматики из файла (.txt, .bnf, .g).",
+                "Правила записываются в виде E -> E '+' T | T; нетерминалы — левые части правил и имена в угловых скобках, остальные символы — терминалы.": "Правила записываются в виде E -> E '+' T | T; нетерминалы — левые части правил и имена в угловых скобках, остальные символы — терминалы.",
+                "При загрузке строятся таблицы LR-анализа; они кешируются на диске, и неизменённая грамматика повторно загружается из кеша.": "При загрузке строятся таблицы LR-анализа; они кешируются на диске, и неизменённая грамматика повторно загружается из кеша.",
+                "Показывает тип загруженной грамматики по Хомскому и её принадлежность к классам LL(1), LR(1) и LALR(1).": "Показывает тип загруженной грамматики по Хомскому и её принадлежность к классам LL(1), LR(1) и LALR(1).",
+                "Восходящий табличный анализ: используется таблица LALR(1), а если в ней есть конфликты — каноническая таблица LR(1).": "Восходящий табличный анализ: используется таблица LALR(1), а если в ней есть конфликты — каноническая таблица LR(1).",
+                "Показывает выбранный метод и число состояний таблицы.": "Показывает выбранный метод и число состояний таблицы.",
+                "Если загружена грамматика, поток лексем разбирается LR-анализатором по её таблице; синтаксические ошибки попадают в таблицу ошибок.": "Если загружена грамматика, поток лексем разбирается LR-анализатором по её таблице; синтаксические ошибки попадают в таблицу ошибок.",
+                "Синтаксический анализ выполняется только для грамматики с бесконфликтной таблицей LR(1) или LALR(1).": "Синтаксический анализ выполняется только для грамматики с бесконфликтной таблицей LR(1) или LALR(1).",
                 "Автор": "Автор",
                 "Описание проекта": "Описание проекта",
                 "Приложение представляет собой текстовый редактор с графическим интерфейсом пользователя.": "Приложение представляет собой текстовый редактор с графическим интерфейсом пользователя.",
@@ -125,6 +195,76 @@ class Translator:
                 "Ожидался символ ';' после выражения": "Expected ';' after expression",
                 "Неизвестный идентификатор 'addd'": "Unknown identifier 'addd'",
                 "Несоответствие типов": "Type mismatch",
+                "Лексем": "Tokens",
+                "Объявлений": "Declarations",
+                "Ошибок": "Errors",
+                "Недопустимый символ": "Invalid character",
+                "Незакрытая строка": "Unterminated string",
+                "Наблюдение за папкой": "Watch Folder",
+                "Наблюдение:": "Watching:",
+                "Наблюдение остановлено": "Watching stopped",
+                "Отмена:": "Undo:",
+                "КБ": "KB",
+                "История отмены очищена: превышен лимит": "Undo history cleared: limit exceeded",
+                "Лимит истории отмены": "Undo History Limit",
+                "Шагов отмены:": "Undo steps:",
+                "Памяти, МБ:": "Memory, MB:",
+                "без ограничения": "unlimited",
+                "Синтаксическая ошибка": "Syntax error",
+                "Синтаксический анализ": "Syntax analysis",
+                "Не удалось загрузить грамматику": "Failed to load grammar",
+                "Грамматика:": "Grammar:",
+                "Правил": "Rules",
+                "Терминалов": "Terminals",
+                "Состояний": "States",
+                "Время построения таблиц": "Table build time",
+                "тип 0 — грамматика общего вида": "type 0 — unrestricted grammar",
+                "тип 1 — контекстно-зависимая": "type 1 — context-sensitive",
+                "тип 2 — контекстно-свободная": "type 2 — context-free",
+                "тип 3 — регулярная": "type 3 — regular",
+                "да": "yes",
+                "нет": "no",
+                "мс": "ms",
+                "Режим длинных строк: строки обрезаны, только чтение": "Long-line mode: lines truncated, read-only",
+                "Синтаксический анализ пропущен: лексический анализ неполный": "Parsing skipped: lexical analysis is incomplete",
+                "Полный список лексем строится в фоне": "Building the full token list in the background",
+                "Лексем (полный список)": "Tokens (full list)",
+                "Перейти к объявлению": "Go to Definition",
+                "Найти использования": "Find References",
+                "Перейти к символу": "Go to Symbol",
+                "Объявление не найдено:": "Definition not found:",
+                "Использования": "References of",
+                "Откройте папку проекта": "Open a project folder first",
+                "Открыть папку проекта": "Open Project Folder",
+                "Папка проекта": "Project folder",
+                "Индексация проекта...": "Indexing the project...",
+                "Индекс проекта готов": "Project index is ready",
+                "Не удалось построить индекс проекта": "Could not build the project index",
+                "Лексемы": "Tokens",
+                "Все лексемы": "All tokens",
+                "Код": "Code",
+                "Тип": "Type",
+                "Лексема": "Lexeme",
+                "ключевое слово": "keyword",
+                "идентификатор": "identifier",
+                "число": "number",
+                "строка": "string",
+                "комментарий": "comment",
+                "оператор": "operator",
+                "разделитель": "separator",
+                "недопустимый символ": "invalid character",
+                "Анализ прерван по времени: результат частичный": "Analysis timed out: partial result",
+                "По Хомскому": "Chomsky hierarchy",
+                "Восходящий табличный анализ": "Table-driven bottom-up parsing",
+                "Для грамматики нельзя построить бесконфликтную таблицу LR(1)": "No conflict-free LR(1) table exists for this grammar",
+                "Загрузка грамматики из файла (.txt, .bnf, .g).": "Loads a grammar from a file (.txt, .bnf, .g).",
+                "Правила записываются в виде E -> E '+' T | T; нетерминалы — левые части правил и имена в угловых скобках, остальные символы — терминалы.": "Rules are written as E -> E '+' T | T; nonterminals are the left-hand sides of rules and names in angle brackets, all other symbols are terminals.",
+                "При загрузке строятся таблицы LR-анализа; они кешируются на диске, и неизменённая грамматика повторно загружается из кеша.": "LR parsing tables are built on load and cached on disk, so an unchanged grammar is loaded again from the cache.",
+                "Показывает тип загруженной грамматики по Хомскому и её принадлежность к классам LL(1), LR(1) и LALR(1).": "Shows the Chomsky type of the loaded grammar and whether it is LL(1), LR(1) and LALR(1).",
+                "Восходящий табличный анализ: используется таблица LALR(1), а если в ней есть конфликты — каноническая таблица LR(1).": "Table-driven bottom-up parsing: the LALR(1) table is used, or the canonical LR(1) table if LALR(1) has conflicts.",
+                "Показывает выбранный метод и число состояний таблицы.": "Shows the chosen method and the number of table states.",
+                "Если загружена грамматика, поток лексем разбирается LR-анализатором по её таблице; синтаксические ошибки попадают в таблицу ошибок.": "If a grammar is loaded, the token stream is parsed by the LR parser using its table; syntax errors are listed in the error table.",
+                "Синтаксический анализ выполняется только для грамматики с бесконфликтной таблицей LR(1) или LALR(1).": "Syntax analysis requires a grammar with a conflict-free LR(1) or LALR(1) table.",
                 "Автор": "Author",
                 "Описание проекта": "Project Description",
                 "Приложение представляет собой текстовый редактор с графическим интерфейсом пользователя.": "The application is a text editor with a graphical user interface.",
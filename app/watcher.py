@@ -0,0 +1,218 @@
+import sys
+import os
+import hashlib
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, QCoreApplication, pyqtSignal
+
+from lexer import analyze
+from symbol_index import CACHE_DIR_NAME
+
+
+# Наблюдение за каталогом: повторный анализ только изменившихся файлов.
+# Используется и окном Compiler, и без GUI: python watcher.py <каталог>
+
+WATCH_EXTENSIONS = (".txt",)
+COALESCE_DELAY = 200  # мс тишины, после которых обрабатывается пачка событий
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DirectoryWatcher(QObject):
+    file_analyzed = pyqtSignal(str, list)  # путь, список Diagnostic
+    file_removed = pyqtSignal(str)
+
+    def __init__(self, root, extensions=WATCH_EXTENSIONS, parent=None):
+        super().__init__(parent)
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(extensions)
+
+        # path -> (mtime_ns, size, sha1)
+        self.files = {}
+        # каталог -> (множество файлов, множество подкаталогов)
+        self.directories = {}
+
+        self.pending_dirs = set()
+        self.pending_files = set()
+
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+        self.fs_watcher.fileChanged.connect(self.on_file_changed)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def is_watched_file(self, name):
+        return name.lower().endswith(self.extensions)
+
+    def start(self):
+        self.add_tree(self.root)
+
+    def stop(self):
+        self.flush_timer.stop()
+        paths = self.fs_watcher.files() + self.fs_watcher.directories()
+        if paths:
+            self.fs_watcher.removePaths(paths)
+        self.files.clear()
+        self.directories.clear()
+        self.pending_dirs.clear()
+        self.pending_files.clear()
+
+    def add_tree(self, top):
+        new_dirs = []
+        new_files = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            if dirpath in self.directories:
+                dirnames[:] = []
+                continue
+            # Запись индекса символов в кеш не должна вызывать пересканирование каталога
+            dirnames[:] = [name for name in dirnames if name != CACHE_DIR_NAME]
+            files = {os.path.join(dirpath, name) for name in filenames if self.is_watched_file(name)}
+            self.directories[dirpath] = (files, {os.path.join(dirpath, name) for name in dirnames})
+            new_dirs.append(dirpath)
+            new_files.extend(files)
+
+        parent = os.path.dirname(top)
+        if parent in self.directories:
+            self.directories[parent][1].add(top)
+
+        if new_dirs:
+            self.fs_watcher.addPaths(new_dirs)
+        if new_files:
+            self.fs_watcher.addPaths(new_files)
+        for path in new_files:
+            self.check_file(path)
+
+    # События файловой системы копятся и обрабатываются одной пачкой
+    def on_directory_changed(self, path):
+        self.pending_dirs.add(path)
+        self.flush_timer.start(COALESCE_DELAY)
+
+    def on_file_changed(self, path):
+        self.pending_files.add(path)
+        self.flush_timer.start(COALESCE_DELAY)
+
+    def flush(self):
+        dirs, self.pending_dirs = self.pending_dirs, set()
+        files, self.pending_files = self.pending_files, set()
+
+        for dirpath in dirs:
+            self.rescan_directory(dirpath)
+        for path in files:
+            if os.path.exists(path):
+                # Запись через замену файла снимает наблюдение с inode
+                self.fs_watcher.addPath(path)
+                self.check_file(path)
+            else:
+                self.remove_file(path)
+
+    # Пересматривается только сам каталог, без обхода всего дерева
+    def rescan_directory(self, dirpath):
+        if dirpath not in self.directories:
+            return
+        if not os.path.isdir(dirpath):
+            self.remove_tree(dirpath)
+            return
+
+        files, subdirs = self.directories[dirpath]
+        present_files = set()
+        present_dirs = set()
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.name == CACHE_DIR_NAME:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    present_dirs.add(entry.path)
+                    if entry.path not in self.directories:
+                        self.add_tree(entry.path)
+                elif self.is_watched_file(entry.name):
+                    present_files.add(entry.path)
+                    if entry.path not in files:
+                        files.add(entry.path)
+                        self.fs_watcher.addPath(entry.path)
+                        self.check_file(entry.path)
+
+        for path in files - present_files:
+            self.remove_file(path)
+        for sub in subdirs - present_dirs:
+            self.remove_tree(sub)
+
+    def remove_tree(self, top):
+        entry = self.directories.pop(top, None)
+        if entry is None:
+            return
+        files, subdirs = entry
+        for path in list(files):
+            self.remove_file(path)
+        for sub in subdirs:
+            self.remove_tree(sub)
+        self.fs_watcher.removePath(top)
+        parent = os.path.dirname(top)
+        if parent in self.directories:
+            self.directories[parent][1].discard(top)
+
+    def remove_file(self, path):
+        entry = self.directories.get(os.path.dirname(path))
+        if entry is not None:
+            entry[0].discard(path)
+        if self.files.pop(path, None) is not None:
+            self.fs_watcher.removePath(path)
+            self.file_removed.emit(path)
+
+    # Сначала mtime и размер, затем хеш содержимого; анализ — только при реальном изменении
+    def check_file(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.remove_file(path)
+            return
+
+        old = self.files.get(path)
+        if old is not None and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            return
+
+        try:
+            digest = file_hash(path)
+        except OSError:
+            return
+        self.files[path] = (st.st_mtime_ns, st.st_size, digest)
+        if old is not None and old[2] == digest:
+            return
+
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            return
+        _, errors, _ = analyze(text)
+        self.file_analyzed.emit(path, errors)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python watcher.py <каталог>", file=sys.stderr)
+        sys.exit(2)
+
+    app = QCoreApplication(sys.argv)
+    watcher = DirectoryWatcher(sys.argv[1])
+
+    def report(path, errors):
+        name = os.path.relpath(path, watcher.root)
+        for error in errors:
+            print(f"{name}:{error.line}:{error.col}: {error.message}", flush=True)
+        print(f"{name}: ошибок {len(errors)}", flush=True)
+
+    watcher.file_analyzed.connect(report)
+    watcher.file_removed.connect(lambda path: print(f"{os.path.relpath(path, watcher.root)}: удалён", flush=True))
+    watcher.start()
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
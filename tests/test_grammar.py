@@ -0,0 +1,112 @@
+import os
+import random
+import time
+
+import pytest
+
+from grammar import build_tables, grammar_hash, load_grammar, parse
+
+
+GRAMMAR = """
+E -> E '+' T | T
+T -> '(' E ')' | num
+"""
+
+BUILD_LIMIT = 5.0  # секунды на build_tables для самой большой сгенерированной грамматики
+PARSE_RATE = 100_000  # не меньше стольких символов в секунду при разборе
+SENTENCE_SIZE = 200_000
+
+
+@pytest.fixture
+def grammar_file(tmp_path):
+    path = tmp_path / "expr.grammar"
+    path.write_text(GRAMMAR, encoding="utf-8")
+    return str(path)
+
+
+def cache_file(cache_dir):
+    return os.path.join(cache_dir, grammar_hash(GRAMMAR) + ".tables")
+
+
+def test_tables_are_cached(grammar_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    tables = load_grammar(grammar_file, cache_dir)
+    assert os.path.exists(cache_file(cache_dir))
+    cached = load_grammar(grammar_file, cache_dir)
+    assert cached.grammar_hash == tables.grammar_hash
+    assert cached.action == tables.action
+
+
+# Битый кеш: pickle.load бросает не только UnpicklingError (ValueError, KeyError, ImportError...)
+@pytest.mark.parametrize("content", [b"", b"garbage", b"\x80\x05K", b"\x80\x04\x95\x05\x00\x00\x00\x00\x00\x00\x00cno_such_module\nX\n."])
+def test_broken_cache_is_rebuilt(grammar_file, tmp_path, content):
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(cache_dir)
+    with open(cache_file(cache_dir), "wb") as f:
+        f.write(content)
+    tables = load_grammar(grammar_file, cache_dir)
+    assert tables.method == "LALR(1)"
+    assert parse(tables, [("num", 1), ("+", 2), ("num", 3)]) is None
+    # Кеш перезаписан рабочими таблицами
+    assert load_grammar(grammar_file, cache_dir).action == tables.action
+
+
+# Выражения с levels уровнями приоритета: L0 -> L0 'op0' L1 | L1 ... P -> '(' L0 ')' | num
+def precedence_grammar(levels):
+    rules = []
+    for i in range(levels):
+        operand = f"L{i + 1}" if i + 1 < levels else "P"
+        rules.append(f"L{i} -> L{i} 'op{i}' {operand} | {operand}")
+    rules.append("P -> '(' L0 ')' | num")
+    return "\n".join(rules) + "\n", precedence_sentence(levels)
+
+
+def precedence_sentence(levels):
+    rnd = random.Random(levels)
+    symbols = [("num", 0)]
+    depth = 0
+    while len(symbols) < SENTENCE_SIZE:
+        symbols.append((f"op{rnd.randrange(levels)}", 0))
+        if depth < 50 and rnd.random() < 0.1:
+            symbols.append(("(", 0))
+            depth += 1
+        symbols.append(("num", 0))
+        if depth and rnd.random() < 0.1:
+            symbols.append((")", 0))
+            depth -= 1
+    return symbols + [(")", 0)] * depth
+
+
+# Список операторов statements видов: S -> S St | St, St -> 'kw0' E ';' | ...
+def statement_grammar(statements):
+    rules = ["S -> S St | St",
+             "St -> " + " | ".join(f"'kw{i}' E ';'" for i in range(statements)),
+             "E -> E '+' num | num"]
+    rnd = random.Random(statements)
+    symbols = []
+    while len(symbols) < SENTENCE_SIZE:
+        symbols += [(f"kw{rnd.randrange(statements)}", 0), ("num", 0), ("+", 0), ("num", 0), (";", 0)]
+    return "\n".join(rules) + "\n", symbols
+
+
+# Замер построения таблиц и скорости разбора на грамматиках разного размера (pytest -s покажет цифры)
+@pytest.mark.parametrize("name, generate, size", [
+    ("precedence", precedence_grammar, 4),
+    ("precedence", precedence_grammar, 16),
+    ("statements", statement_grammar, 20),
+    ("statements", statement_grammar, 80),
+])
+def test_grammar_benchmark(name, generate, size):
+    text, symbols = generate(size)
+    started = time.perf_counter()
+    tables = build_tables(text)
+    build_time = time.perf_counter() - started
+    assert tables.method == "LALR(1)"
+
+    started = time.perf_counter()
+    assert parse(tables, symbols, budget=0) is None
+    rate = len(symbols) / (time.perf_counter() - started)
+    print(f"{name}({size}): {tables.rule_count} rules, {tables.state_count} states, "
+          f"build {build_time * 1000:.0f} ms, parse {rate / 1000:.0f}k symbols/s")
+    assert build_time < BUILD_LIMIT
+    assert rate > PARSE_RATE
@@ -0,0 +1,135 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app", "lsp_server.py")
+URI = "file:///project/main.txt"
+
+LINES = 2000
+LATENCY_LIMIT = 0.5  # секунды на ответ definition сразу после серии правок
+
+
+# Клиент LSP поверх stdio сервера, запущенного отдельным процессом
+class Client:
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, SERVER], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.next_id = 0
+        self.notifications = []
+
+    def send(self, message):
+        message["jsonrpc"] = "2.0"
+        body = json.dumps(message).encode("utf-8")
+        self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.process.stdin.flush()
+
+    def read(self):
+        length = None
+        while True:
+            line = self.process.stdout.readline()
+            assert line, "сервер закрыл stdout"
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(self.process.stdout.read(length))
+
+    def notify(self, method, params):
+        self.send({"method": method, "params": params})
+
+    # Запрос и время до ответа; уведомления сервера по пути откладываются
+    def request(self, method, params):
+        self.next_id += 1
+        started = time.perf_counter()
+        self.send({"id": self.next_id, "method": method, "params": params})
+        while True:
+            message = self.read()
+            if message.get("id") == self.next_id:
+                return message, time.perf_counter() - started
+            self.notifications.append(message)
+
+    def close(self):
+        self.request("shutdown", None)
+        self.notify("exit", None)
+        self.process.stdin.close()
+        self.process.wait(timeout=5)
+        self.errors = self.process.stderr.read().decode("utf-8")
+        self.process.stdout.close()
+        self.process.stderr.close()
+
+
+@pytest.fixture
+def client():
+    client = Client()
+    client.request("initialize", {"capabilities": {}})
+    client.notify("initialized", {})
+    yield client
+    if client.process.poll() is None:
+        client.close()
+
+
+def insert(line, character, text):
+    position = {"line": line, "character": character}
+    return {"range": {"start": position, "end": position}, "text": text}
+
+
+def test_definition_after_rapid_edits(client):
+    lines = [f"var x{i} = {i};" for i in range(LINES)]
+    client.notify("textDocument/didOpen", {"textDocument": {
+        "uri": URI, "languageId": "compiler", "version": 0, "text": "\n".join(lines) + "\n"}})
+
+    # Набор выражения по символу в конце документа, без пауз между правками
+    expression = "var total = " + " + ".join(f"x{i}" for i in range(0, LINES, 7)) + ";"
+    line = len(lines)
+    latencies = []
+    for version, char in enumerate(expression, 1):
+        client.notify("textDocument/didChange", {
+            "textDocument": {"uri": URI, "version": version},
+            "contentChanges": [insert(line, version - 1, char)]})
+        if version % 200 == 0:
+            _, latency = client.request("textDocument/definition", {
+                "textDocument": {"uri": URI}, "position": {"line": line, "character": 13}})
+            latencies.append(latency)
+
+    response, latency = client.request("textDocument/definition", {
+        "textDocument": {"uri": URI}, "position": {"line": line, "character": expression.index("x63") + 1}})
+    latencies.append(latency)
+    assert response["result"]["range"]["start"] == {"line": 63, "character": 4}
+    print("definition latency, ms:", [round(latency * 1000, 1) for latency in latencies])
+    assert max(latencies) < LATENCY_LIMIT, latencies
+
+
+def test_diagnostics_are_debounced(client):
+    client.notify("textDocument/didOpen", {"textDocument": {
+        "uri": URI, "languageId": "compiler", "version": 0, "text": "var a = 1;\n"}})
+    for version in range(1, 51):
+        client.notify("textDocument/didChange", {
+            "textDocument": {"uri": URI, "version": version},
+            "contentChanges": [insert(1, version - 1, "@")]})
+    time.sleep(1.0)
+    client.request("textDocument/semanticTokens/full", {"textDocument": {"uri": URI}})
+    published = [message["params"] for message in client.notifications
+                 if message.get("method") == "textDocument/publishDiagnostics"]
+    # Серия правок без пауз публикуется один раз, для последней версии
+    assert len(published) == 1
+    assert published[0]["version"] == 50
+    assert len(published[0]["diagnostics"]) == 50
+
+
+def test_bad_notification_does_not_stop_server(client):
+    client.notify("textDocument/didOpen", {"textDocument": {
+        "uri": URI, "languageId": "compiler", "version": 0, "text": "var a = 1;\na\n"}})
+    client.notify("textDocument/didChange", {"textDocument": {"uri": URI, "version": 1}})
+    response, _ = client.request("textDocument/definition", {
+        "textDocument": {"uri": URI}, "position": {"line": 1, "character": 0}})
+    assert response["result"]["range"]["start"] == {"line": 0, "character": 4}
+    client.close()
+    assert client.process.returncode == 0
+    assert "textDocument/didChange: KeyError" in client.errors
@@ -0,0 +1,80 @@
+import random
+import time
+
+import pytest
+
+from grammar import ParseTimeout, build_tables, parse
+from lexer import PARTIAL_MESSAGE, PASS_TIME_BUDGET, analyze, tokenize
+
+
+TIME_MARGIN = 1.0  # секунды сверх PASS_TIME_BUDGET на проверку времени и сборку результата
+
+# Входы, которые не разбираются за PASS_TIME_BUDGET: анализ должен вернуть частичный результат вовремя
+CORPUS = {
+    "long_line": lambda: "a+" * 5_000_000,
+    "deep_nesting": lambda: "(" * 5_000_000 + ")" * 5_000_000,
+    "unterminated_strings": lambda: '"abc\n' * 3_000_000,
+    "invalid_characters": lambda: "@" * 10_000_000,
+    "quote_spam": lambda: '"' * 10_000_001,
+    # Одна строка в 100 МБ из экранирований: одно совпадение регулярного выражения не прерывается
+    "escapes_on_huge_line": lambda: '"' + "\\a" * 50_000_000,
+}
+
+GRAMMAR = """
+S -> S ';' E | E
+E -> E '+' T | T
+T -> '(' S ')' | num
+"""
+
+
+@pytest.mark.parametrize("name", CORPUS)
+def test_tokenize_stops_within_budget(name):
+    text = CORPUS[name]()
+    started = time.perf_counter()
+    tokens, errors = tokenize(text)
+    elapsed = time.perf_counter() - started
+    assert elapsed < PASS_TIME_BUDGET + TIME_MARGIN, elapsed
+    assert errors[-1].message == PARTIAL_MESSAGE
+    # Частичный результат — префикс полного: лексемы идут по порядку и не выходят за текст
+    if len(tokens):
+        assert list(tokens.offsets) == sorted(tokens.offsets)
+        assert tokens.offsets[-1] + tokens.lengths[-1] <= len(text)
+
+
+def test_analyze_stops_within_budget():
+    started = time.perf_counter()
+    _, errors, _ = analyze("var x = (" * 2_000_000)
+    assert time.perf_counter() - started < PASS_TIME_BUDGET + TIME_MARGIN
+    assert errors[-1].message == PARTIAL_MESSAGE
+
+
+def test_huge_string_is_one_token():
+    text = '"' + "x" * 20_000_000 + '"'
+    tokens, errors = tokenize(text)
+    assert errors == []
+    assert len(tokens) == 1 and tokens.lengths[0] == len(text)
+
+
+@pytest.mark.parametrize("symbols", [
+    [("num", 1), ("+", 1)] * 3_000_000 + [("num", 1)],
+    [("(", 1)] * 3_000_000 + [("num", 1)] + [(")", 1)] * 3_000_000,
+], ids=["long_sum", "deep_nesting"])
+def test_parse_stops_within_budget(symbols):
+    tables = build_tables(GRAMMAR)
+    started = time.perf_counter()
+    with pytest.raises(ParseTimeout):
+        parse(tables, symbols)
+    assert time.perf_counter() - started < PASS_TIME_BUDGET + TIME_MARGIN
+
+
+def test_has_long_lines_matches_naive():
+    compiler = pytest.importorskip("compiler")
+    rnd = random.Random(3)
+    for _ in range(3000):
+        text = "".join(rnd.choice("ab\n") for _ in range(rnd.randrange(40)))
+        limit = rnd.randrange(1, 8)
+        expected = any(len(line) > limit for line in text.split("\n"))
+        assert compiler.has_long_lines(text, limit) == expected, (text, limit)
+        truncated = compiler.truncate_long_lines(text, limit)
+        assert truncated.count("\n") == text.count("\n")
+        assert not compiler.has_long_lines(truncated, limit + len(compiler.LONG_LINE_MARK))
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import snapshot
+from snapshot import PieceTable, count_words, plain_text
+
+
+ALPHABET = "ab \n\t"
+
+
+def random_text(rnd, size):
+    return "".join(rnd.choice(ALPHABET) for _ in range(size))
+
+
+# Мелкие лимиты, чтобы склейка и сборка таблицы срабатывали на коротких текстах
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(snapshot, "MERGE_LIMIT", 8)
+    monkeypatch.setattr(snapshot, "PIECE_LIMIT", 40)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_piece_table_matches_string(small_limits, seed):
+    rnd = random.Random(seed)
+    text = random_text(rnd, rnd.randrange(60))
+    table = PieceTable(text)
+    for version in range(200):
+        position = rnd.randrange(len(text) + 1)
+        removed = rnd.randrange(len(text) - position + 1) if rnd.random() < 0.6 else 0
+        added = random_text(rnd, rnd.choice([0, 1, 1, 2, 5, 20]))
+        table.replace(position, removed, added)
+        text = text[:position] + added + text[position + removed:]
+
+        snap = table.snapshot(version)
+        assert snap.text == text
+        assert len(snap) == len(text)
+        assert snap.word_count() == len(text.split())
+        assert snap.line_count() == text.count("\n") + 1
+        assert "".join(snap.chunks(3)) == text
+        assert snap.is_blank() == (not text or text.isspace())
+
+
+def test_snapshot_is_immutable():
+    table = PieceTable("one two\nthree")
+    before = table.snapshot(1)
+    table.replace(3, 4, " 2 2")
+    after = table.snapshot(2)
+    assert before.text == "one two\nthree" and before.word_count() == 3
+    assert after.text == "one 2 2\nthree" and after.word_count() == 4
+
+
+def test_loaded_text_is_not_copied():
+    text = "x" * 100_000
+    snap = PieceTable(text).snapshot(0)
+    assert snap.text is text
+
+
+def test_typing_merges_pieces():
+    table = PieceTable("a" * 100_000)
+    for i in range(1000):
+        table.replace(50_000 + i, 0, "b")
+    assert len(table.pieces) == 3
+    assert table.snapshot(0).text == "a" * 50_000 + "b" * 1000 + "a" * 50_000
+
+
+def test_lines_and_positions():
+    text = "first\n\nthird line\nlast"
+    snap = PieceTable(text).snapshot(0)
+    assert list(snap.lines()) == text.split("\n")
+    assert list(snap.lines(1, 3)) == ["", "third line"]
+    assert list(snap.lines(3)) == ["last"]
+    for offset in range(len(text) + 1):
+        line, col = snap.position(offset)
+        assert snap.offset(line, col) == offset
+    assert snap.position(text.index("third")) == (3, 1)
+
+
+def test_count_words_across_chunks():
+    text = "alpha beta  gamma\ndelta"
+    for size in range(1, len(text) + 1):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert count_words(chunks) == 4
+
+
+def test_plain_text_matches_to_plain_text():
+    assert plain_text("a\u2029b\u2028c\xa0d") == "a\nb\nc d"